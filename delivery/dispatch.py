@@ -0,0 +1,199 @@
+import heapq
+import random
+import string
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q
+
+from orders.models import Order
+from .models import DeliveryPersonnel
+
+ACTIVE_STATUSES = ("assigned", "picked_up", "on_the_way")
+MAX_LOAD = getattr(settings, "DISPATCH_MAX_LOAD", 3)
+VERSION_KEY = "delivery:dispatch:version"
+
+
+def riders():
+    """
+    Delivery users with their active order count. A rider with a
+    DeliveryPersonnel row marked unavailable is off duty; no row means on.
+    """
+    off_duty = DeliveryPersonnel.objects.filter(user=OuterRef("pk"), is_available=False)
+    return (
+        User.objects.filter(profile__is_delivery_guy=True)
+        .annotate(
+            active_load=Count("assigned_deliveries", filter=Q(assigned_deliveries__status__in=ACTIVE_STATUSES)),
+            is_available=~Exists(off_duty),
+        )
+        .order_by("username")
+    )
+
+
+class RiderIndex:
+    """
+    Available riders keyed by active load. A min-heap of (load, rider_id)
+    with lazy deletion: changing a load pushes a fresh entry and stale ones
+    are skipped when they surface, so pick/assign/release are O(log n).
+    """
+
+    def __init__(self):
+        self.loads = {}
+        self._heap = []
+        self.version = None
+        self.loaded_at = 0
+
+    def load(self):
+        self.loads = {r.id: r.active_load for r in riders() if r.is_available}
+        self._heap = [(load, rider_id) for rider_id, load in self.loads.items()]
+        heapq.heapify(self._heap)
+        self.loaded_at = time.monotonic()
+
+    def _push(self, rider_id):
+        heapq.heappush(self._heap, (self.loads[rider_id], rider_id))
+
+    def pick(self, max_load=MAX_LOAD):
+        """Least-loaded available rider id, or None if everyone is at max_load."""
+        while self._heap:
+            load, rider_id = self._heap[0]
+            if self.loads.get(rider_id) != load:
+                heapq.heappop(self._heap)  # stale entry
+                continue
+            return rider_id if load < max_load else None
+        return None
+
+    def adjust(self, rider_id, delta):
+        if rider_id in self.loads:
+            self.loads[rider_id] = max(0, self.loads[rider_id] + delta)
+            self._push(rider_id)
+
+    def set(self, rider_id, load):
+        if rider_id in self.loads:
+            self.loads[rider_id] = load
+            self._push(rider_id)
+
+    def __len__(self):
+        return len(self.loads)
+
+
+# One index per process. Every change bumps a version; a process that sees
+# a version it didn't produce reloads from the database, and so does any
+# index older than RELOAD_SECONDS (rolled back assignments). The version is
+# only as shared as the cache backend, so the index is a hint: dispatch()
+# re-counts the picked rider's load under a row lock before assigning.
+RELOAD_SECONDS = 60
+_index = RiderIndex()
+_lock = threading.RLock()
+
+
+def _current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY, 0)
+    return version
+
+
+def index():
+    """The process's rider index, reloaded if another process changed things."""
+    version = _current_version()
+    with _lock:
+        if _index.version != version or time.monotonic() - _index.loaded_at > RELOAD_SECONDS:
+            _index.load()
+            _index.version = version
+    return _index
+
+
+def changed(update=None):
+    """
+    Record a change to rider loads or availability. `update(index)` patches
+    the local index in place when it was current; otherwise it reloads later.
+    """
+    try:
+        new = cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        new = None
+    with _lock:
+        if update is not None and new is not None and _index.version == new - 1:
+            update(_index)
+            _index.version = new
+        else:
+            _index.version = None
+
+
+# =========================
+# ASSIGNMENT
+# =========================
+def _delivery_code():
+    return "".join(random.choices(string.digits, k=6))
+
+
+def _locked_load(rider_id):
+    """The rider's active order count, with the rider's row locked until commit."""
+    User.objects.select_for_update().filter(pk=rider_id).values_list("pk", flat=True).first()
+    return Order.objects.filter(delivery_person_id=rider_id, status__in=ACTIVE_STATUSES).count()
+
+
+def dispatch(order_id):
+    """
+    Give one `preparing`, unassigned order to the least-loaded available
+    rider. Returns the rider id, or None if it wasn't dispatchable or every
+    rider is at DISPATCH_MAX_LOAD.
+    """
+    with _lock, transaction.atomic():
+        order = (
+            Order.objects.select_for_update()
+            .filter(pk=order_id, status="preparing", delivery_person__isnull=True)
+            .first()
+        )
+        if order is None:
+            return None
+
+        while True:
+            rider_id = index().pick()
+            if rider_id is None:
+                return None
+            load = _locked_load(rider_id)
+            if load < MAX_LOAD:
+                break
+            # another process filled this rider since our index loaded
+            _index.set(rider_id, load)
+
+        # counted right away so a batch inside one transaction stays balanced;
+        # delivery.signals only bumps the version for this transition
+        order._dispatched = True
+        order.transition(
+            "assigned", delivery_person_id=rider_id, delivery_code=order.delivery_code or _delivery_code(),
+        )
+        _index.set(rider_id, load + 1)
+        return rider_id
+
+
+def dispatch_pending(limit=None, batch=200):
+    """
+    Dispatch waiting orders oldest first, committing `batch` at a time.
+    Returns (assigned, still_waiting).
+    """
+    waiting = list(
+        Order.objects.filter(status="preparing", delivery_person__isnull=True)
+        .order_by("created_at", "id")
+        .values_list("id", flat=True)[:limit]
+    )
+    assigned = 0
+    for start in range(0, len(waiting), batch):
+        try:
+            with transaction.atomic():
+                for order_id in waiting[start:start + batch]:
+                    if dispatch(order_id) is not None:
+                        assigned += 1
+                    elif index().pick() is None:
+                        return assigned, len(waiting) - assigned  # everyone is full
+        except Exception:
+            _index.version = None  # counted assignments were rolled back
+            raise
+    return assigned, len(waiting) - assigned
@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from accounts.models import Profile
+from orders.jobs import enqueue
+from orders.models import Order
+from orders.transitions import order_transitioned
+from . import dispatch
+from .models import DeliveryPersonnel
+
+AUTO_DISPATCH = getattr(settings, "DISPATCH_AUTO", True)
+
+
+def _active_rider(rider_id, status):
+    return rider_id if rider_id and status in dispatch.ACTIVE_STATUSES else None
+
+
+def _move_load(released, taken):
+    def update(index):
+        if released:
+            index.adjust(released, -1)
+        if taken:
+            index.adjust(taken, +1)
+    transaction.on_commit(lambda: dispatch.changed(update))
+
+
+def _rider_changed(order, old_rider, old_status):
+    released = _active_rider(old_rider, old_status)
+    taken = _active_rider(order.delivery_person_id, order.status)
+
+    if getattr(order, "_dispatched", False):
+        # dispatch() already counted it in this process's index
+        transaction.on_commit(lambda: dispatch.changed(lambda index: None))
+    elif released != taken:
+        _move_load(released, taken)
+
+    if not AUTO_DISPATCH:
+        return
+    if order.status == "preparing" and old_status != "preparing" and not order.delivery_person_id:
+        enqueue(dispatch.dispatch, order_id=order.pk)
+    elif released and not taken:
+        # a rider freed up; hand them the oldest waiting order
+        enqueue(dispatch.dispatch_pending, limit=1)
+
+
+@receiver(post_save, sender=Order)
+def track_rider_load(sender, instance, created, **kwargs):
+    # old values come from orders.signals.remember_order_state
+    old_rider, old_status = getattr(instance, "_rider_old", None) or (None, None)
+    _rider_changed(instance, old_rider, old_status)
+
+
+@receiver(order_transitioned)
+def track_transition(sender, order, previous, previous_rider, **kwargs):
+    _rider_changed(order, previous_rider, previous)
+
+
+@receiver(post_delete, sender=Order)
+def release_rider_load(sender, instance, **kwargs):
+    released = _active_rider(instance.delivery_person_id, instance.status)
+    if released:
+        _move_load(released, None)
+
+
+@receiver(pre_save, sender=Profile)
+def remember_rider_flag(sender, instance, update_fields=None, **kwargs):
+    # checkout saves phone/address on every order; only is_delivery_guy matters to the index
+    instance._was_rider = instance.is_delivery_guy
+    if instance.pk and (update_fields is None or "is_delivery_guy" in update_fields):
+        instance._was_rider = Profile.objects.filter(pk=instance.pk).values_list("is_delivery_guy", flat=True).first()
+
+
+@receiver(post_save, sender=Profile)
+def rider_flag_changed(sender, instance, created, **kwargs):
+    was_rider = False if created else getattr(instance, "_was_rider", None)
+    if was_rider != instance.is_delivery_guy:
+        transaction.on_commit(dispatch.changed)
+
+
+@receiver(post_save, sender=DeliveryPersonnel)
+def riders_changed(sender, instance, **kwargs):
+    transaction.on_commit(dispatch.changed)
+    if AUTO_DISPATCH and instance.is_available:
+        enqueue(dispatch.dispatch_pending)
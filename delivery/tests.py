@@ -1,3 +1,140 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import Profile
+from orders.models import Job, Order
+from . import dispatch
+from .models import DeliveryPersonnel
+from .views import DELIVERED_HISTORY
+
+
+class DispatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        dispatch._index.version = None
+        self.customer = User.objects.create_user("ada", password="pass12345")
+        self.riders = []
+        for name in ("r1", "r2", "r3"):
+            rider = User.objects.create_user(name, password="pass12345")
+            Profile.objects.update_or_create(user=rider, defaults={"is_delivery_guy": True})
+            self.riders.append(rider)
+
+    def _order(self, status="preparing", rider=None):
+        return Order.objects.create(
+            user=self.customer, delivery_address="12 Allen Avenue", phone="0800",
+            total_amount=Decimal("1500.00"), status=status, delivery_person=rider,
+        )
+
+    def test_picks_least_loaded_available_rider(self):
+        r1, r2, r3 = self.riders
+        self._order("assigned", r1)
+        self._order("on_the_way", r1)
+        self._order("picked_up", r2)
+        DeliveryPersonnel.objects.create(user=r3, phone_number="1", vehicle_type="bike", is_available=False)
+
+        self.assertEqual(dispatch.index().pick(), r2.id)
+
+    def test_dispatch_pending_spreads_load_and_stops_at_capacity(self):
+        for _ in range(3 * dispatch.MAX_LOAD + 2):
+            self._order()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            assigned, waiting = dispatch.dispatch_pending()
+
+        self.assertEqual((assigned, waiting), (3 * dispatch.MAX_LOAD, 2))
+        loads = {r.id: r.active_load for r in dispatch.riders()}
+        self.assertEqual(set(loads.values()), {dispatch.MAX_LOAD})
+        self.assertTrue(all(o.delivery_code for o in Order.objects.filter(status="assigned")))
+
+    def test_stale_index_never_overloads_a_rider(self):
+        filled = [self._order().pk for _ in range(3 * dispatch.MAX_LOAD)]
+        order = self._order()
+        dispatch.index()  # every rider idle as far as this process knows
+
+        # another process assigns them; its cache bump never reaches this one
+        for i, rider in enumerate(self.riders):
+            chunk = filled[i * dispatch.MAX_LOAD:(i + 1) * dispatch.MAX_LOAD]
+            Order.objects.filter(pk__in=chunk).update(status="assigned", delivery_person=rider)
+
+        self.assertIsNone(dispatch.dispatch(order.id))
+        self.assertEqual(set(dispatch.index().loads.values()), {dispatch.MAX_LOAD})
+        self.assertEqual(Order.objects.get(pk=order.pk).status, "preparing")
+
+    def test_only_the_rider_flag_bumps_the_version(self):
+        dispatch.index()
+        version = cache.get(dispatch.VERSION_KEY)
+        profile = self.customer.profile
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.phone = "0801"
+            profile.save(update_fields=["phone", "default_address"])  # what checkout does
+            profile.save()
+        self.assertEqual(cache.get(dispatch.VERSION_KEY), version)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.is_delivery_guy = True
+            profile.save()
+        self.assertEqual(cache.get(dispatch.VERSION_KEY), version + 1)
+        self.assertIn(self.customer.id, dispatch.index().loads)
+
+    def test_finished_delivery_frees_capacity(self):
+        order = self._order()
+        with self.captureOnCommitCallbacks(execute=True):
+            rider_id = dispatch.dispatch(order.id)
+        self.assertEqual(dispatch.index().loads[rider_id], 1)
+
+        order.refresh_from_db()
+        order.status = "delivered"
+        with self.captureOnCommitCallbacks(execute=True):
+            order.save(update_fields=["status"])
+
+        self.assertEqual(dispatch.index().loads[rider_id], 0)
+        self.assertTrue(Job.objects.filter(func="delivery.dispatch.dispatch_pending").exists())
+
+    def test_new_preparing_order_is_queued_for_dispatch(self):
+        order = self._order(status="pending")
+        order.status = "preparing"
+        order.save(update_fields=["status"])
+
+        job = Job.objects.get(func="delivery.dispatch.dispatch")
+        self.assertEqual(job.kwargs, {"order_id": order.id})
+
+
+class DashboardTests(TestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user("ada", password="pass12345")
+        self.rider = User.objects.create_user("rider", password="pass12345")
+        Profile.objects.update_or_create(user=self.rider, defaults={"is_delivery_guy": True})
+        self.client.force_login(self.rider)
+
+    def _orders(self, status, n):
+        Order.objects.bulk_create([
+            Order(user=self.customer, delivery_address="12 Allen Avenue", phone="0800",
+                  total_amount=Decimal("1500.00"), status=status, delivery_person=self.rider)
+            for _ in range(n)
+        ])
+
+    def _queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("delivery:dashboard"))
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx)
+
+    def test_query_count_does_not_grow_with_history(self):
+        self._orders("assigned", 1)
+        self._orders("delivered", 2)
+        _, few = self._queries()
+
+        self._orders("on_the_way", 2)
+        self._orders("delivered", 50)
+        response, many = self._queries()
 
-# Create your tests here.
+        self.assertEqual(few, many)
+        self.assertEqual(len(response.context["active"]), 3)
+        self.assertEqual(len(response.context["delivered"]), DELIVERED_HISTORY)
+        self.assertEqual(response.context["counts"]["delivered"], 52)
@@ -2,9 +2,13 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
+from django.db.models import Case, Count, Q, Value, When
 from django.views.decorators.http import require_POST
 
 from orders.models import Order
+from .dispatch import ACTIVE_STATUSES
+
+DELIVERED_HISTORY = 5
 
 
 # ---------------------------
@@ -13,30 +17,36 @@ from orders.models import Order
 @login_required
 def delivery_dashboard(request):
     user = request.user
-
-    orders = Order.objects.filter(
-        delivery_person=user
-    ).order_by("-created_at")
-
-    assigned = orders.filter(status="assigned")
-    picked_up = orders.filter(status="picked_up")
-    on_the_way = orders.filter(status="on_the_way")
-    delivered = orders.filter(status="delivered")
-
     today = timezone.localdate()
-    today_delivered = orders.filter(
-        status="delivered",
-        created_at__date=today
+
+    orders = Order.objects.filter(delivery_person=user)
+    counts = orders.aggregate(
+        assigned=Count("id", filter=Q(status="assigned")),
+        picked_up=Count("id", filter=Q(status="picked_up")),
+        on_the_way=Count("id", filter=Q(status="on_the_way")),
+        delivered=Count("id", filter=Q(status="delivered")),
+        today_delivered=Count("id", filter=Q(status="delivered", created_at__date=today)),
+    )
+    active_count = counts["assigned"] + counts["picked_up"] + counts["on_the_way"]
+
+    # active orders first, then only the newest DELIVERED_HISTORY delivered ones
+    rows = (
+        orders.filter(status__in=ACTIVE_STATUSES + ("delivered",))
+        .annotate(item_count=Count("items"))
+        .order_by(
+            Case(When(status="delivered", then=Value(1)), default=Value(0)),
+            "-created_at", "-id",
+        )[:active_count + DELIVERED_HISTORY]
     )
+    active, delivered = [], []
+    for order in rows:
+        (delivered if order.status == "delivered" else active).append(order)
 
     return render(request, "delivery/dashboard.html", {
-        "orders": orders,
-        "assigned": assigned,
-        "picked_up": picked_up,
-        "on_the_way": on_the_way,
+        "active": active,
         "delivered": delivered,
-        "today_delivered": today_delivered,
-        "total_assigned": orders.count(),
+        "counts": counts,
+        "active_count": active_count,
     })
 
 
@@ -60,9 +70,12 @@ def update_delivery_status(request, order_id):
             messages.error(request, "Order not ready for pickup.")
             return redirect("delivery:dashboard")
 
-        order.status = "picked_up"
-        order.save(update_fields=["status"])
-        messages.success(request, "Order picked up.")
+        try:
+            order.transition("picked_up", actor=request.user)
+        except ValueError as e:
+            messages.error(request, str(e))
+        else:
+            messages.success(request, "Order picked up.")
 
     # STEP 2 → on the way
     elif action == "on_the_way":
@@ -70,9 +83,12 @@ def update_delivery_status(request, order_id):
             messages.error(request, "You must pick up first.")
             return redirect("delivery:dashboard")
 
-        order.status = "on_the_way"
-        order.save(update_fields=["status"])
-        messages.success(request, "Order is now on the way.")
+        try:
+            order.transition("on_the_way", actor=request.user)
+        except ValueError as e:
+            messages.error(request, str(e))
+        else:
+            messages.success(request, "Order is now on the way.")
 
     else:
         messages.error(request, "Invalid action.")
@@ -102,9 +118,11 @@ def verify_delivery_code(request, order_id):
         messages.error(request, "Invalid delivery code.")
         return redirect("delivery:dashboard")
 
-    order.status = "delivered"
-    order.delivery_verified = True
-    order.save(update_fields=["status", "delivery_verified"])
+    try:
+        order.transition("delivered", actor=request.user, delivery_verified=True)
+    except ValueError as e:
+        messages.error(request, str(e))
+        return redirect("delivery:dashboard")
 
     messages.success(request, "Delivery completed successfully.")
     return redirect("delivery:dashboard")
\ No newline at end of file
@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import F
+
+from .models import CatalogVersion, Category, FoodItem
+
+
+def current_version():
+    """
+    The catalog version, read from its database row so every worker (on
+    any host) sees a bump; entries cached under an older version are
+    simply never looked up again. One primary-key lookup.
+    """
+    return CatalogVersion.objects.filter(pk=1).values_list("version", flat=True).first() or 0
+
+
+def bump_version():
+    if not CatalogVersion.objects.filter(pk=1).update(version=F("version") + 1):
+        CatalogVersion.objects.get_or_create(pk=1, defaults={"version": 1})
+    catalog.clear()
+
+
+class CatalogCache:
+    """
+    Per-worker, version-keyed store for menu data.
+    Entries expire after `ttl` seconds and the least recently used ones
+    are dropped once `max_entries` is reached. The version itself is
+    re-read at most every `version_ttl` seconds, so a warm page makes no
+    queries and another worker's bump shows up within that window.
+    """
+
+    def __init__(self, ttl=300, max_entries=64, version_ttl=2):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.version_ttl = version_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._version = (0, None)  # (expires, version)
+        self._lock = threading.Lock()
+
+    def version(self):
+        now = time.monotonic()
+        expires, version = self._version
+        if version is None or expires <= now:
+            version = current_version()
+            self._version = (now + self.version_ttl, version)
+        return version
+
+    def get(self, key, loader):
+        full_key = (self.version(), key)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(full_key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = loader()
+
+        with self._lock:
+            self._entries[full_key] = (now + self.ttl, value)
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = (0, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "version": self._version[1],
+            }
+
+
+catalog = CatalogCache(
+    ttl=getattr(settings, "MENU_CATALOG_TTL", 300),
+    max_entries=getattr(settings, "MENU_CATALOG_MAX_ENTRIES", 64),
+    version_ttl=getattr(settings, "MENU_CATALOG_VERSION_TTL", 2),
+)
+
+
+# =========================
+# READ API (used by menu.views)
+# =========================
+def categories():
+    return catalog.get("categories", lambda: list(Category.objects.all()))
+
+
+def available_foods():
+    """Available, non-archived foods with their category preloaded."""
+    return catalog.get(
+        "foods",
+        lambda: list(
+            FoodItem.objects.select_related("category")
+            .filter(available=True, is_archived=False)
+        ),
+    )
+
+
+def foods_by_id():
+    return catalog.get("foods_by_id", lambda: {f.id: f for f in available_foods()})
+
+
+def foods_in_category(category_id):
+    return [f for f in available_foods() if str(f.category_id) == str(category_id)]
+
+
+def featured_foods(limit=6):
+    return available_foods()[:limit]
@@ -1,4 +1,6 @@
 from django import forms
+from orders.jobs import enqueue
+from .images import build_variants
 from .models import Category, FoodItem
 
 class CategoryForm(forms.ModelForm):
@@ -9,4 +11,14 @@ class CategoryForm(forms.ModelForm):
 class FoodItemForm(forms.ModelForm):
     class Meta:
         model = FoodItem
-        fields = ["category", "name", "description", "price", "image", "available"]
\ No newline at end of file
+        fields = ["category", "name", "description", "price", "image", "available"]
+
+    def save(self, commit=True):
+        if "image" in self.changed_data:
+            # the old photo's derivatives must not outlive it; srcset is empty until the job runs
+            self.instance.image_variants = {}
+        food = super().save(commit=commit)
+        if commit and "image" in self.changed_data:
+            # WebP derivatives are built by the job worker
+            enqueue(build_variants, food_id=food.pk)
+        return food
@@ -0,0 +1,87 @@
+import hashlib
+import logging
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import FoodItem
+
+logger = logging.getLogger(__name__)
+
+WIDTHS = tuple(getattr(settings, "MENU_IMAGE_WIDTHS", (320, 640, 960)))
+QUALITY = getattr(settings, "MENU_IMAGE_QUALITY", 80)
+DERIVED_DIR = "foods/derived"
+
+
+def content_hash(name, storage=default_storage):
+    digest = hashlib.sha256()
+    with storage.open(name, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:20]
+
+
+def derivative_name(digest, width):
+    return f"{DERIVED_DIR}/{digest}-{width}.webp"
+
+
+def _encode(img, width):
+    height = max(1, round(img.height * width / img.width))
+    resized = img.resize((width, height), Image.Resampling.LANCZOS)
+    out = BytesIO()
+    resized.save(out, "WEBP", quality=QUALITY, method=4)
+    return out.getvalue()
+
+
+def generate(name, storage=default_storage):
+    """
+    WebP copies of the image at `name` for each configured width (never
+    upscaled). Files are named after the source's content hash, so the
+    same upload is only ever encoded once. Returns {"<width>": path}.
+    """
+    digest = content_hash(name, storage)
+    try:
+        with storage.open(name, "rb") as f:
+            img = Image.open(f)
+            img = ImageOps.exif_transpose(img)
+            img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+    except (UnidentifiedImageError, OSError) as e:
+        logger.warning("Skipping image derivatives for %s: %s", name, e)
+        return {}
+
+    widths = [w for w in WIDTHS if w < img.width] or [img.width]
+    if img.width not in widths and img.width < max(WIDTHS):
+        widths.append(img.width)
+
+    variants = {}
+    for width in sorted(widths):
+        path = derivative_name(digest, width)
+        if not storage.exists(path):
+            storage.save(path, ContentFile(_encode(img, width)))
+        variants[str(width)] = path
+    return variants
+
+
+def refresh_variants(food):
+    """Regenerate food.image_variants from its current image and save it."""
+    food.image_variants = generate(food.image.name) if food.image else {}
+    food.save(update_fields=["image_variants"])
+    return food.image_variants
+
+
+def build_variants(food_id):
+    """Job entry point (see menu.forms)."""
+    food = FoodItem.objects.filter(pk=food_id).first()
+    if food is not None:
+        refresh_variants(food)
+
+
+def srcset(food, storage=default_storage):
+    variants = getattr(food, "image_variants", None) or {}
+    return ", ".join(
+        f"{storage.url(path)} {width}w"
+        for width, path in sorted(variants.items(), key=lambda kv: int(kv[0]))
+    )
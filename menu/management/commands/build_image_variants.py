@@ -0,0 +1,58 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from menu.images import generate
+from menu.models import FoodItem
+
+
+def _generate(name):
+    # runs in a worker process: file work only, no database access
+    return name, generate(name)
+
+
+class Command(BaseCommand):
+    help = "Generate WebP image derivatives for food images (backfill)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--all", action="store_true", help="Also redo foods that already have derivatives.")
+
+    def handle(self, *args, **options):
+        foods = FoodItem.objects.exclude(image="").exclude(image__isnull=True)
+        if not options["all"]:
+            foods = foods.filter(image_variants={})
+
+        by_name = {}
+        for pk, name in foods.values_list("pk", "image"):
+            by_name.setdefault(name, []).append(pk)
+        if not by_name:
+            self.stdout.write("Nothing to do.")
+            return
+
+        # forked workers must not inherit open database connections
+        connections.close_all()
+
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=max(1, options["workers"])) as pool:
+            futures = [pool.submit(_generate, name) for name in by_name]
+            for future in as_completed(futures):
+                try:
+                    name, variants = future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"Failed: {e}")
+                    continue
+                if not variants:
+                    failed += 1
+                    continue
+                for food in FoodItem.objects.filter(pk__in=by_name[name]):
+                    food.image_variants = variants
+                    food.save(update_fields=["image_variants"])
+                done += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Built derivatives for {done} image(s); {failed} failed."
+        ))
@@ -16,6 +16,8 @@ class FoodItem(models.Model):
     description = models.TextField(blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     image = models.ImageField(upload_to="foods/", blank=True, null=True)
+    # {"<width>": "<storage path>"} WebP derivatives, see menu.images
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     available = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     is_archived = models.BooleanField(default=False)
@@ -23,6 +25,18 @@ class FoodItem(models.Model):
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            models.Index(fields=["available", "is_archived", "category"], name="food_listing_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.name
+
+
+class CatalogVersion(models.Model):
+    """
+    One row, bumped on every menu write. Workers key their in-process
+    catalog copies on it (see menu.catalog), so it has to live somewhere
+    every worker reads: here rather than in a per-process cache.
+    """
+    version = models.BigIntegerField(default=0)
@@ -0,0 +1,112 @@
+import re
+from bisect import bisect_left
+from collections import defaultdict
+
+from . import catalog
+
+WORD_RE = re.compile(r"\w+")
+
+# How much a hit in each field counts towards a food's score.
+FIELD_WEIGHTS = (("name", 3.0), ("category", 2.0), ("description", 1.0))
+
+# ...and how good the match between query word and indexed word was.
+EXACT, PREFIX, FUZZY = 1.0, 0.7, 0.5
+
+
+def words(text):
+    return WORD_RE.findall((text or "").lower())
+
+
+def max_typos(term):
+    if len(term) < 4:
+        return 0
+    return 1 if len(term) < 8 else 2
+
+
+def within_distance(a, b, limit):
+    """True if the edit distance (with transpositions) of a and b is <= limit."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    prev2, prev = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return False
+        prev2, prev = prev, cur
+    return prev[-1] <= limit
+
+
+class MenuIndex:
+    """
+    Inverted index over the available foods: word -> {food_id: weight}.
+    The vocabulary is kept sorted so prefixes are a bisect away.
+    """
+
+    def __init__(self, foods):
+        self.foods = {f.id: f for f in foods}
+        postings = defaultdict(dict)
+        for f in foods:
+            fields = {"name": f.name, "category": f.category.name, "description": f.description}
+            for field, weight in FIELD_WEIGHTS:
+                for word in words(fields[field]):
+                    if postings[word].get(f.id, 0) < weight:
+                        postings[word][f.id] = weight
+        self.postings = dict(postings)
+        self.vocabulary = sorted(self.postings)
+
+    def _matches(self, term):
+        """[(word, match quality)] for one query word."""
+        found = {}
+        start = bisect_left(self.vocabulary, term)
+        for word in self.vocabulary[start:]:
+            if not word.startswith(term):
+                break
+            found[word] = EXACT if word == term else PREFIX
+
+        limit = max_typos(term)
+        if limit and not found:
+            for word in self.vocabulary:
+                # compare against prefixes too, the word may be half typed
+                lengths = range(len(term) - limit, len(term) + limit + 1)
+                if any(within_distance(term, word[:n], limit) for n in lengths if n <= len(word)):
+                    found[word] = FUZZY
+        return found
+
+    def search(self, q, limit=None):
+        """Foods matching every word of `q`, best first."""
+        terms = words(q)
+        if not terms:
+            return []
+
+        scores = None
+        for term in terms:
+            term_scores = {}
+            for word, quality in self._matches(term).items():
+                for food_id, weight in self.postings[word].items():
+                    score = weight * quality
+                    if score > term_scores.get(food_id, 0):
+                        term_scores[food_id] = score
+
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {fid: s + term_scores[fid] for fid, s in scores.items() if fid in term_scores}
+            if not scores:
+                return []
+
+        ranked = sorted(scores, key=lambda fid: (-scores[fid], self.foods[fid].name.lower()))
+        return [self.foods[fid] for fid in ranked[:limit]]
+
+
+def menu_index():
+    """Built from the cached catalog; rebuilt when the catalog version bumps."""
+    return catalog.catalog.get("search_index", lambda: MenuIndex(catalog.available_foods()))
+
+
+def search_foods(q, limit=None):
+    return menu_index().search(q, limit)
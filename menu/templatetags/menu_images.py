@@ -0,0 +1,11 @@
+from django import template
+
+from menu.images import srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def image_srcset(food):
+    """`srcset` value listing the WebP derivatives of food.image."""
+    return srcset(food)
@@ -1,3 +1,181 @@
-from django.test import TestCase
+import tempfile
+import time
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import F
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from orders import jobs
+
+from . import catalog, images
+from .forms import FoodItemForm
+from .models import CatalogVersion, Category, FoodItem
+from .search import MenuIndex
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Rice")
+        self.food = FoodItem.objects.create(category=self.category, name="Jollof", price=Decimal("1500.00"))
+
+    def test_repeat_reads_are_hits(self):
+        before = catalog.catalog.stats()
+        self.assertEqual([f.name for f in catalog.available_foods()], ["Jollof"])
+        with self.assertNumQueries(0):  # the version is memoised too
+            catalog.available_foods()
+        after = catalog.catalog.stats()
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertEqual(after["hits"] - before["hits"], 1)
+
+    def test_food_save_invalidates(self):
+        catalog.available_foods()
+        self.food.available = False
+        self.food.save()
+        self.assertEqual(catalog.available_foods(), [])
+
+    def test_category_save_invalidates(self):
+        catalog.categories()
+        self.category.name = "Rice dishes"
+        self.category.save()
+        self.assertEqual([c.name for c in catalog.categories()], ["Rice dishes"])
+
+    def test_bump_from_another_worker_is_seen(self):
+        catalog.available_foods()
+        # another process's write: the row and version move, this process's store is untouched
+        FoodItem.objects.filter(pk=self.food.pk).update(available=False)
+        CatalogVersion.objects.filter(pk=1).update(version=F("version") + 1)
+        self.assertEqual([f.name for f in catalog.available_foods()], ["Jollof"])  # inside the window
+        later = time.monotonic() + catalog.catalog.version_ttl + 1
+        with mock.patch("menu.catalog.time.monotonic", return_value=later):
+            self.assertEqual(catalog.available_foods(), [])
+
+    def test_warm_menu_page_makes_no_queries(self):
+        self.client.get(reverse("menu:menu_list"))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("menu:menu_list"), {"q": "jol"})
+        self.assertEqual([f.name for f in response.context["foods"]], ["Jollof"])
+
+
+class MenuSearchTests(TestCase):
+    def setUp(self):
+        rice = Category.objects.create(name="Rice")
+        self.soups = Category.objects.create(name="Soups")
+        self.jollof = FoodItem.objects.create(
+            category=rice, name="Jollof", price=Decimal("1500.00"), description="Smoky party classic",
+        )
+        self.fried = FoodItem.objects.create(category=rice, name="Fried Rice", price=Decimal("1500.00"))
+        self.egusi = FoodItem.objects.create(
+            category=self.soups, name="Egusi", price=Decimal("2000.00"), description="Melon seed soup, great with rice",
+        )
+        self.index = MenuIndex(catalog.available_foods())
+
+    def _names(self, q):
+        return [f.name for f in self.index.search(q)]
+
+    def test_prefix_and_typo_match(self):
+        self.assertEqual(self._names("jol"), ["Jollof"])
+        self.assertEqual(self._names("jolof"), ["Jollof"])
+        self.assertEqual(self._names("egsui"), ["Egusi"])  # transposition
+        self.assertEqual(self._names("xyz"), [])
+
+    def test_name_beats_category_beats_description(self):
+        self.assertEqual(self._names("rice"), ["Fried Rice", "Jollof", "Egusi"])
+        self.assertEqual(self._names("rice melon"), ["Egusi"])  # every word must match
+
+    def test_menu_list_scopes_query_to_category(self):
+        response = self.client.get(reverse("menu:menu_list"), {"cat": self.soups.pk, "q": "rice"})
+        self.assertEqual([f.name for f in response.context["foods"]], ["Egusi"])
+
+    def test_suggest_returns_ranked_json(self):
+        data = self.client.get(reverse("menu:search_suggest"), {"q": "ric"}).json()
+        self.assertEqual([r["name"] for r in data["results"]], ["Fried Rice", "Jollof", "Egusi"])
+        self.assertEqual(data["results"][0]["url"], reverse("menu:food_detail", args=[self.fried.pk]))
+        self.assertEqual(self.client.get(reverse("menu:search_suggest")).json()["results"], [])
+
+
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.storage = FileSystemStorage(location=tmp.name, base_url="/media/")
+
+    def _upload(self, width, height=100, color="red"):
+        out = BytesIO()
+        Image.new("RGB", (width, height), color).save(out, "PNG")
+        return self.storage.save("foods/dish.png", ContentFile(out.getvalue()))
+
+    def _widths(self, variants):
+        result = {}
+        for width, path in variants.items():
+            with self.storage.open(path) as f, Image.open(f) as img:
+                result[width] = (img.format, img.width)
+        return result
+
+    def test_wide_image_gets_every_configured_width(self):
+        variants = images.generate(self._upload(1000), self.storage)
+        self.assertEqual(self._widths(variants), {"320": ("WEBP", 320), "640": ("WEBP", 640), "960": ("WEBP", 960)})
+
+    def test_never_upscales(self):
+        variants = images.generate(self._upload(500), self.storage)
+        self.assertEqual(self._widths(variants), {"320": ("WEBP", 320), "500": ("WEBP", 500)})
+
+        variants = images.generate(self._upload(200, color="blue"), self.storage)
+        self.assertEqual(self._widths(variants), {"200": ("WEBP", 200)})
+
+    def test_same_content_is_encoded_once(self):
+        first = images.generate(self._upload(700), self.storage)
+        second = images.generate(self._upload(700), self.storage)
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.storage.listdir(images.DERIVED_DIR)[1]), 3)
+
+    def test_non_image_is_skipped(self):
+        name = self.storage.save("foods/notes.png", ContentFile(b"not an image"))
+        with self.assertLogs("menu.images", "WARNING"):
+            self.assertEqual(images.generate(name, self.storage), {})
+
+    def test_srcset_tag_lists_widths_in_order(self):
+        food = FoodItem(image_variants={"960": "foods/derived/a-960.webp", "320": "foods/derived/a-320.webp"})
+        rendered = Template("{% load menu_images %}{% image_srcset food %}").render(Context({"food": food}))
+        self.assertEqual(rendered, "/media/foods/derived/a-320.webp 320w, /media/foods/derived/a-960.webp 960w")
+        self.assertEqual(images.srcset(FoodItem()), "")
+
+
+class FoodImageFormTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media = override_settings(MEDIA_ROOT=tmp.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.food = FoodItem.objects.create(
+            category=Category.objects.create(name="Rice"), name="Jollof", price=Decimal("1500.00"),
+            image_variants={"320": "foods/derived/old-320.webp"},
+        )
+
+    def _png(self, color):
+        out = BytesIO()
+        Image.new("RGB", (400, 100), color).save(out, "PNG")
+        return SimpleUploadedFile("dish.png", out.getvalue(), content_type="image/png")
+
+    def test_new_image_drops_old_variants_until_job_runs(self):
+        data = {"category": self.food.category_id, "name": "Jollof", "price": "1500.00", "available": "on"}
+        form = FoodItemForm(data, {"image": self._png("green")}, instance=self.food)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+
+        self.food.refresh_from_db()
+        self.assertEqual(images.srcset(self.food), "")
+
+        [job_id] = jobs.claim("w1")
+        self.assertEqual(jobs.run(job_id), "done")
+        self.food.refresh_from_db()
+        self.assertEqual(list(self.food.image_variants), ["320", "400"])
+        self.assertNotIn("old-320", images.srcset(self.food))
@@ -6,5 +6,6 @@ app_name = "menu"
 urlpatterns = [
     path("", views.home, name="home"),
     path("menu/", views.menu_list, name="menu_list"),
+    path("menu/search/", views.search_suggest, name="search_suggest"),
     path("food/<int:pk>/", views.food_detail, name="food_detail"),
 ]
@@ -1,19 +1,16 @@
+from django.http import JsonResponse
 from django.shortcuts import render, get_object_or_404
-from .models import Category, FoodItem
-from orders.models import Cart, CartItem
+from django.urls import reverse
+from .models import FoodItem
+from . import catalog
+from .search import search_foods
+from orders.shopper import get_shopper
 
 def home(request):
-    featured = FoodItem.objects.filter(is_archived=False, available=True)[:6]
+    featured = catalog.featured_foods(6)
 
-    cart_item_ids = set()
-    cart_quantities = {}
-
-    if request.user.is_authenticated:
-        cart = Cart.objects.filter(user=request.user).first()
-        if cart:
-            items = cart.items.select_related('food').all()
-            cart_item_ids = {item.food_id for item in items}
-            cart_quantities = {item.food_id: item.quantity for item in items}
+    cart_quantities = get_shopper(request).cart_quantities
+    cart_item_ids = set(cart_quantities)
 
     return render(request, 'home.html', {
         'featured': featured,
@@ -23,44 +20,56 @@ def home(request):
     })
 
 def menu_list(request):
-    categories = Category.objects.all()
-    foods = FoodItem.objects.filter(available=True, is_archived=False)
+    categories = catalog.categories()
+    foods = catalog.available_foods()
 
     cat = request.GET.get("cat")
     if cat:
-        foods = foods.filter(category_id=cat)
+        foods = catalog.foods_in_category(cat)
 
-    cart_item_ids = set()
-    cart_quantities = {}
+    q = (request.GET.get("q") or "").strip()
+    if q:
+        in_scope = {f.id for f in foods}
+        foods = [f for f in search_foods(q) if f.id in in_scope]
 
-    if request.user.is_authenticated:
-        cart = Cart.objects.filter(user=request.user).first()
-        if cart:
-            items = cart.items.select_related('food').all()
-            cart_item_ids = {item.food_id for item in items}
-            cart_quantities = {item.food_id: item.quantity for item in items}
+    cart_quantities = get_shopper(request).cart_quantities
+    cart_item_ids = set(cart_quantities)
 
     return render(request, "menu_list.html", {
         "categories": categories,
         "foods": foods,
         "active_cat": int(cat) if cat and cat.isdigit() else None,
+        "q": q,
         "cart_item_ids": cart_item_ids,
         "cart_quantities": cart_quantities,
     })
 
-def food_detail(request, pk):
-    food = get_object_or_404(FoodItem, pk=pk, available=True)
+def search_suggest(request):
+    """Type-ahead: top matches for ?q=, served from the in-memory index."""
+    q = (request.GET.get("q") or "").strip()[:100]
+    foods = search_foods(q, limit=8) if q else []
 
-    in_cart = False
-    quantity = 0
+    return JsonResponse({
+        "q": q,
+        "results": [
+            {
+                "id": f.id,
+                "name": f.name,
+                "category": f.category.name,
+                "price": str(f.price),
+                "image": f.image.url if f.image else None,
+                "url": reverse("menu:food_detail", args=[f.id]),
+            }
+            for f in foods
+        ],
+    })
+
+def food_detail(request, pk):
+    # Archived-but-available foods are not in the catalog; fall back to the DB.
+    food = catalog.foods_by_id().get(pk) or get_object_or_404(FoodItem, pk=pk, available=True)
 
-    if request.user.is_authenticated:
-        cart = Cart.objects.filter(user=request.user).first()
-        if cart:
-            item = cart.items.filter(food=food).first()
-            if item:
-                in_cart = True
-                quantity = item.quantity
+    quantity = get_shopper(request).cart_quantities.get(food.id, 0)
+    in_cart = quantity > 0
 
     return render(request, "food_detail.html", {
         "food": food,
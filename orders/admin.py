@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Cart, CartItem, Order, OrderItem
+from .models import Cart, CartItem, Order, OrderEvent, OrderItem
 
 class CartItemInline(admin.TabularInline):
     model = CartItem
@@ -8,12 +8,28 @@ class CartItemInline(admin.TabularInline):
 @admin.register(Cart)
 class CartAdmin(admin.ModelAdmin):
     inlines = [CartItemInline]
-    list_display = ("id", "user", "created_at")
+    list_display = ("id", "user", "item_count", "subtotal", "created_at")
+    readonly_fields = ("item_count", "subtotal")
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Inline edits bypass the views, so rebuild the counters
+        Cart.objects.filter(pk=form.instance.pk).recalculate_totals()
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 0
 
+class OrderEventInline(admin.TabularInline):
+    # append-only: written by orders.transitions and orders.signals
+    model = OrderEvent
+    extra = 0
+    can_delete = False
+    fields = readonly_fields = ("from_status", "to_status", "actor", "created_at")
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = (
@@ -31,7 +47,7 @@ class OrderAdmin(admin.ModelAdmin):
     list_filter = ("status", "payment_method", "is_paid", "delivery_verified")
     search_fields = ("user__username", "phone", "delivery_address")
 
-    inlines = [OrderItemInline]
+    inlines = [OrderItemInline, OrderEventInline]
 
     fieldsets = (
         ("Order Info", {
@@ -0,0 +1,74 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import CartItem
+
+
+# =========================
+# CART MUTATIONS
+# =========================
+# Each change is a single conditional UPDATE (or INSERT for a new line)
+# keyed on the (cart, food) unique pair, so concurrent taps never lose
+# increments. Cart counters move in the same transaction.
+
+def increment_item(cart, food, step=1):
+    """Add `step` units of `food` to `cart`. Returns the new quantity."""
+    with transaction.atomic():
+        updated = CartItem.objects.filter(cart=cart, food=food).update(quantity=F("quantity") + step)
+
+        if not updated:
+            try:
+                with transaction.atomic():
+                    CartItem.objects.create(cart=cart, food=food, quantity=step)
+            except IntegrityError:
+                # Another request inserted the line first; add on top of it
+                CartItem.objects.filter(cart=cart, food=food).update(quantity=F("quantity") + step)
+
+        cart.bump_totals(step, food.price)
+        return _quantity(cart, food)
+
+
+def decrement_item(cart, food):
+    """Remove one unit of `food`; deletes the line at zero. Returns the new quantity."""
+    with transaction.atomic():
+        lines = CartItem.objects.filter(cart=cart, food=food)
+
+        if lines.filter(quantity__gt=1).update(quantity=F("quantity") - 1):
+            cart.bump_totals(-1, food.price)
+            return _quantity(cart, food)
+
+        deleted, _ = lines.filter(quantity__lte=1).delete()
+        if deleted:
+            cart.bump_totals(-1, food.price)
+        return 0
+
+
+def set_item_quantity(item, quantity):
+    """Set a line to `quantity` (deleting it at zero) relative to what is stored now."""
+    with transaction.atomic():
+        current = (
+            CartItem.objects.select_for_update()
+            .filter(pk=item.pk)
+            .values_list("quantity", flat=True)
+            .first()
+        )
+        if current is None:
+            return 0
+
+        if quantity <= 0:
+            CartItem.objects.filter(pk=item.pk).delete()
+            quantity = 0
+        else:
+            CartItem.objects.filter(pk=item.pk).update(quantity=quantity)
+
+        item.cart.bump_totals(quantity - current, item.food.price)
+        return quantity
+
+
+def _quantity(cart, food):
+    return (
+        CartItem.objects.filter(cart=cart, food=food)
+        .values_list("quantity", flat=True)
+        .first()
+        or 0
+    )
@@ -0,0 +1,70 @@
+from decimal import Decimal
+
+from django.db import transaction
+
+from wallet import ledger
+from . import rollups
+from .models import Cart, CartItem, Order, OrderItem
+
+
+def snapshot_cart(cart):
+    """Cart lines with their food, read in one query."""
+    return list(cart.items.select_related("food"))
+
+
+def snapshot_total(lines):
+    return sum((i.food.price * i.quantity for i in lines), Decimal("0.00"))
+
+
+def place_order(user, cart, *, address, phone, payment_method="cod"):
+    """
+    Turn the cart into an Order in a constant number of statements:
+    one cart read, the order insert, one bulk insert for all lines, an
+    optional ledger debit and one delete to clear the cart.
+
+    Raises ValueError with a customer-facing message if the order can't
+    be placed.
+    """
+    if payment_method not in {"cod", "wallet"}:
+        payment_method = "cod"
+
+    with transaction.atomic():
+        # Serialize concurrent checkouts of the same cart
+        Cart.objects.select_for_update().filter(pk=cart.pk).first()
+
+        lines = snapshot_cart(cart)
+        if not lines:
+            raise ValueError("Your cart is empty.")
+
+        total = snapshot_total(lines)
+        paid_with_wallet = payment_method == "wallet"
+
+        order = Order.objects.create(
+            user=user,
+            delivery_address=address,
+            phone=phone,
+            total_amount=total,
+            status="pending",
+            payment_method=payment_method,
+            is_paid=paid_with_wallet,
+        )
+
+        order_items = OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                food=i.food,
+                quantity=i.quantity,
+                price_at_purchase=i.food.price,
+            )
+            for i in lines
+        ])
+        rollups.record_items(order, order_items)
+
+        if paid_with_wallet:
+            # raises ValueError (no wallet / insufficient funds), rolling the order back
+            ledger.debit(user, total, source="order", order=order, note=f"Payment for Order #{order.id}")
+
+        CartItem.objects.filter(cart=cart).delete()
+        cart.reset_totals()
+
+    return order
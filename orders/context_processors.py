@@ -1,9 +1,4 @@
-from .models import Cart
+from .shopper import get_shopper
 
 def cart_count(request):
-    count = 0
-    if request.user.is_authenticated:
-        cart = Cart.objects.filter(user=request.user).first()
-        if cart:
-            count = sum(cart.items.values_list('quantity', flat=True))
-    return {'cart_count': count}
\ No newline at end of file
+    return {'cart_count': get_shopper(request).cart_count}
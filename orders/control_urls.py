@@ -1,8 +1,9 @@
 from django.urls import path
 from .control_views import (
     dashboard,
+    board, board_events, board_poll,
     orders_list, order_detail,
-    assign_delivery_person,
+    assign_delivery_person, dispatch_all,
     update_status,  # ADD THIS IMPORT
     verify_code,    # ADD THIS IMPORT
 
@@ -10,8 +11,9 @@ from .control_views import (
     category_create, category_edit,
     food_create, food_edit,
 
-    topups_list, topup_review,
+    topups_list, topup_review, topups_bulk,
     wallet_transactions,
+    export_orders, export_order_items, export_wallet_transactions,
     toggle_food_archive,
 )
 
@@ -19,11 +21,17 @@ app_name = "control"
 
 urlpatterns = [
     path("", dashboard, name="dashboard"),
+    path("board/", board, name="board"),
+    path("board/events/", board_events, name="board_events"),
+    path("board/poll/", board_poll, name="board_poll"),
 
     # Orders
     path("orders/", orders_list, name="orders_list"),
     path("orders/<int:order_id>/", order_detail, name="order_detail"),
     path("orders/<int:order_id>/assign-delivery/", assign_delivery_person, name="assign_delivery_person"),
+    path("orders/dispatch/", dispatch_all, name="dispatch_all"),
+    path("orders/export/", export_orders, name="export_orders"),
+    path("orders/items/export/", export_order_items, name="export_order_items"),
 
     # Delivery/Rider URLs (NEW)
     path("delivery/update-status/<int:order_id>/", update_status, name="update_status"),
@@ -41,5 +49,7 @@ urlpatterns = [
     # Wallet
     path("wallet/topups/", topups_list, name="topups_list"),
     path("wallet/topups/<int:topup_id>/", topup_review, name="topup_review"),
+    path("wallet/topups/bulk/", topups_bulk, name="topups_bulk"),
     path("wallet/transactions/", wallet_transactions, name="wallet_transactions"),
+    path("wallet/transactions/export/", export_wallet_transactions, name="export_wallet_transactions"),
 ]
\ No newline at end of file
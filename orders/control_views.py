@@ -1,19 +1,25 @@
 from django.contrib.auth.decorators import user_passes_test
 from django.shortcuts import render, get_object_or_404, redirect
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.http import url_has_allowed_host_and_scheme
 from django.contrib import messages
 from django.db import transaction
 from django.utils import timezone
 from menu.models import FoodItem, Category
-from wallet.models import WalletTopUp, Wallet, WalletTransaction
+from wallet import ledger
+from wallet.models import WalletTopUp, WalletTransaction
 from menu.forms import CategoryForm, FoodItemForm
 from django.core.paginator import Paginator
-from django.db.models import Q
-from datetime import timedelta
-from decimal import Decimal
-from django.db.models import Sum
-from django.db.models.functions import Coalesce
-from orders.models import Order, OrderItem
+from django.db.models import DecimalField, ExpressionWrapper, F, Q
+from orders.models import Order, OrderEvent, OrderItem
+from orders.pagination import CursorPage, CursorPaginator
+from orders.search import search
+from orders.stats import dashboard_stats
+from orders.transitions import allowed
+from orders import events, exports
+from delivery.dispatch import dispatch_pending, riders
 from django.contrib.auth.models import User
+import asyncio
 import random
 import string
 
@@ -42,21 +48,21 @@ def _generate_delivery_code():
 def assign_delivery_person(request, order_id):
     order = get_object_or_404(Order, id=order_id)
 
-    delivery_guys = User.objects.filter(profile__is_delivery_guy=True)
+    delivery_guys = riders()
 
     if request.method == "POST":
         rider_id = request.POST.get("delivery_person")
         rider = get_object_or_404(User, id=rider_id)
 
-        order.delivery_person = rider
-        order.status = "assigned"
-
-        if not order.delivery_code:
-            order.delivery_code = _generate_delivery_code()
-
-        order.save(update_fields=["delivery_person", "status", "delivery_code"])
-
-        messages.success(request, f"Order assigned to {rider.username}")
+        try:
+            order.transition(
+                "assigned", actor=request.user, delivery_person=rider,
+                delivery_code=order.delivery_code or _generate_delivery_code(),
+            )
+        except ValueError as e:
+            messages.error(request, str(e))
+        else:
+            messages.success(request, f"Order assigned to {rider.username}")
         return redirect("control:order_detail", order_id=order.id)
 
     return render(request, "control/assign_delivery.html", {
@@ -80,19 +86,16 @@ def topups_list(request):
         qs = qs.filter(status=status)
 
     if q:
-        qs = qs.filter(
-            Q(id__icontains=q) |
-            Q(user__username__icontains=q) |
-            Q(user__email__icontains=q) |
-            Q(reference__icontains=q)
-        )
-
-    paginator = Paginator(qs, 25)
-    page_obj = paginator.get_page(request.GET.get("page"))
+        # ranked hits from the token index; one page, no cursors
+        page_obj = CursorPage(search(qs, "topup", q))
+    else:
+        page_obj = CursorPaginator(qs, 25).get_page(request.GET.get("after"), request.GET.get("before"))
 
     return render(request, "control/topups_list.html", {
         "page_obj": page_obj,
+        "topups": page_obj,
         "status": status,
+        "current_status": status,
         "q": q,
     })
 
@@ -120,66 +123,162 @@ def toggle_food_archive(request, food_id):
 # =========================
 @staff_required
 def dashboard(request):
-    today = timezone.localdate()
-    last_7 = timezone.now() - timedelta(days=7)
-
-    total_orders = Order.objects.count()
-    pending_orders = Order.objects.filter(status="pending").count()
-    preparing_orders = Order.objects.filter(status="preparing").count()
-    assigned_orders = Order.objects.filter(status="assigned").count()
-    on_the_way_orders = Order.objects.filter(status="on_the_way").count()
-    delivered_today = Order.objects.filter(status="delivered", created_at__date=today).count()
-    delivered_orders = Order.objects.filter(status="delivered").count()
-    cancelled_orders = Order.objects.filter(status="cancelled").count()
-
-    paid_orders = Order.objects.filter(is_paid=True).count()
-
-    today_revenue = (
-        Order.objects.filter(is_paid=True, created_at__date=today)
-        .aggregate(v=Coalesce(Sum("total_amount"), Decimal("0.00")))["v"]
-    )
-
-    last7_revenue = (
-        Order.objects.filter(is_paid=True, created_at__gte=last_7)
-        .aggregate(v=Coalesce(Sum("total_amount"), Decimal("0.00")))["v"]
-    )
-
-    pending_topups = WalletTopUp.objects.filter(status="pending").count()
-
-    total_food = FoodItem.objects.count()
-    available_food = FoodItem.objects.filter(available=True).count()
-
-    top_foods = (
-        OrderItem.objects.select_related("food")
-        .values("food__name")
-        .annotate(qty=Coalesce(Sum("quantity"), 0))
-        .order_by("-qty")[:5]
-    )
-
     recent_orders = Order.objects.select_related("user").order_by("-created_at")[:8]
     recent_topups = WalletTopUp.objects.select_related("user", "reviewed_by").order_by("-created_at")[:8]
 
     return render(request, "control/dashboard.html", {
-        "total_orders": total_orders,
-        "pending_orders": pending_orders,
-        "preparing_orders": preparing_orders,
-        "assigned_orders": assigned_orders,
-        "on_the_way_orders": on_the_way_orders,
-        "delivered_today": delivered_today,
-        "delivered_orders": delivered_orders,
-        "cancelled_orders": cancelled_orders,
-        "paid_orders": paid_orders,
-        "today_revenue": today_revenue,
-        "last7_revenue": last7_revenue,
-        "pending_topups": pending_topups,
-        "total_food": total_food,
-        "available_food": available_food,
-        "top_foods": top_foods,
+        **dashboard_stats(),
         "recent_orders": recent_orders,
         "recent_topups": recent_topups,
     })
 
 
+@staff_required
+def dispatch_all(request):
+    if request.method != "POST":
+        return redirect("control:orders_list")
+
+    assigned, waiting = dispatch_pending()
+    if assigned:
+        messages.success(request, f"Dispatched {assigned} order(s).")
+    if waiting:
+        messages.warning(request, f"{waiting} order(s) still waiting: no rider has capacity.")
+    if not assigned and not waiting:
+        messages.info(request, "No preparing orders are waiting for a rider.")
+    next_url = request.POST.get("next")
+    if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        return redirect(next_url)
+    return redirect("control:orders_list")
+
+
+# =========================
+# LIVE BOARD
+# =========================
+BOARD_STATUSES = ["pending", "preparing", "assigned", "picked_up", "on_the_way"]
+BOARD_HEARTBEAT = 15  # seconds
+BOARD_BATCH_WINDOW = 1.0  # events arriving this close together go out as one message
+BOARD_BATCH_MAX = 50
+BOARD_MAX_SECONDS = 30 * 60  # then the browser's EventSource reconnects
+BOARD_POLL_MAX = 200  # logged events per poll
+
+
+@staff_required
+def board(request):
+    orders = (
+        Order.objects.filter(status__in=BOARD_STATUSES)
+        .select_related("user")
+        .order_by("-created_at")[:200]
+    )
+    columns = {s: [] for s in BOARD_STATUSES}
+    for o in orders:
+        columns[o.status].append(o)
+
+    labels = dict(Order.STATUS_CHOICES)
+    return render(request, "control/board.html", {
+        "columns": [(s, labels.get(s, s), columns[s]) for s in BOARD_STATUSES],
+        # the only control page that streams; the rest poll board_poll
+        "live_stream": events.streaming(),
+    })
+
+
+def _coalesce(batch, event):
+    # latest state per order; an order created within the batch stays "created"
+    seen = batch.get(event["order_id"], {})
+    batch[event["order_id"]] = {**seen, **event, "kind": seen.get("kind", event["kind"])}
+
+
+def _orders_message(batch, pending):
+    return {
+        "orders": list(batch.values()),
+        "created": sum(1 for e in batch.values() if e["kind"] == "created"),
+        "pending": pending,
+    }
+
+
+async def _board_stream():
+    sub = events.get_broker().subscribe(events.STAFF_CHANNEL)
+    loop = asyncio.get_running_loop()
+    try:
+        yield "retry: 5000\n\n"
+        pending = await Order.objects.filter(status="pending").acount()
+        yield events.sse("orders", _orders_message({}, pending))
+
+        end = loop.time() + BOARD_MAX_SECONDS
+        while loop.time() < end:
+            event = await sub.get(BOARD_HEARTBEAT)
+            if event is None:
+                yield ": ping\n\n"
+                continue
+
+            # coalesce a burst: one message, one COUNT
+            batch = {}
+            _coalesce(batch, event)
+            deadline = loop.time() + BOARD_BATCH_WINDOW
+            while len(batch) < BOARD_BATCH_MAX:
+                event = await sub.get(deadline - loop.time())
+                if event is None:
+                    break
+                _coalesce(batch, event)
+
+            pending = await Order.objects.filter(status="pending").acount()
+            yield events.sse("orders", _orders_message(batch, pending))
+    finally:
+        sub.close()
+
+
+@staff_required
+async def board_events(request):
+    """
+    text/event-stream of batched order events for staff. Only with
+    ORDER_EVENTS_STREAMING (ASGI); otherwise 204 and pages use board_poll.
+    """
+    if not events.streaming():
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(_board_stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@staff_required
+def board_poll(request):
+    """
+    The stream's "orders" message for polling pages, read from the order
+    event log: events after ?after=<event id>, coalesced per order, plus
+    `last` to send next time. Without ?after= only the counters.
+    """
+    after = request.GET.get("after", "")
+    batch = {}
+    if after.isdigit():
+        last = int(after)
+        rows = (
+            OrderEvent.objects.filter(id__gt=last)
+            .order_by("id")
+            .values(
+                "id", "order_id", "from_status", "to_status", "created_at",
+                total_amount=F("order__total_amount"), customer=F("order__user__username"),
+            )[:BOARD_POLL_MAX]
+        )
+        labels = dict(Order.STATUS_CHOICES)
+        for r in rows:
+            last = r["id"]
+            _coalesce(batch, {
+                "order_id": r["order_id"],
+                "status": r["to_status"],
+                "status_display": labels.get(r["to_status"], r["to_status"]),
+                "previous": r["from_status"] or None,
+                "at": r["created_at"].isoformat(),
+                "kind": "status" if r["from_status"] else "created",
+                "total_amount": str(r["total_amount"]),
+                "customer": r["customer"],
+            })
+    else:
+        last = OrderEvent.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+    pending = Order.objects.filter(status="pending").count()
+    return JsonResponse({**_orders_message(batch, pending), "last": last})
+
+
 # =========================
 # ORDERS LIST
 # =========================
@@ -195,15 +294,10 @@ def orders_list(request):
         qs = qs.filter(status=status)
 
     if q:
-        qs = qs.filter(
-            Q(id__icontains=q) |
-            Q(user__username__icontains=q) |
-            Q(user__email__icontains=q) |
-            Q(phone__icontains=q)
-        )
-
-    paginator = Paginator(qs, 25)
-    page_obj = paginator.get_page(request.GET.get("page"))
+        # ranked hits from the token index; one page, no cursors
+        page_obj = CursorPage(search(qs, "order", q))
+    else:
+        page_obj = CursorPaginator(qs, 25).get_page(request.GET.get("after"), request.GET.get("before"))
 
     return render(request, "control/orders_list.html", {
         "page_obj": page_obj,
@@ -217,32 +311,7 @@ def orders_list(request):
 # WALLET DEBIT
 # =========================
 def _wallet_debit_for_order_once(staff_user, order) -> bool:
-    already = WalletTransaction.objects.filter(
-        order=order, source="order", tx_type="debit"
-    ).exists()
-
-    if already:
-        return False
-
-    wallet = Wallet.objects.select_for_update().filter(user=order.user).first()
-    if wallet is None:
-        raise ValueError("User does not have a wallet.")
-
-    if wallet.balance < order.total_amount:
-        raise ValueError("Insufficient wallet balance.")
-
-    wallet.balance -= order.total_amount
-    wallet.save(update_fields=["balance", "updated_at"])
-
-    WalletTransaction.objects.create(
-        wallet=wallet,
-        tx_type="debit",
-        source="order",
-        amount=order.total_amount,
-        order=order,
-        note=f"Order payment approved by {staff_user}",
-    )
-    return True
+    return ledger.debit_order_once(order, note=f"Order payment approved by {staff_user}")
 
 
 # =========================
@@ -255,8 +324,6 @@ def order_detail(request, order_id):
         id=order_id
     )
 
-    allowed_statuses = {"pending", "preparing", "assigned", "on_the_way", "delivered", "cancelled"}
-
     if request.method == "POST":
         action = (request.POST.get("action") or "").strip()
 
@@ -266,12 +333,15 @@ def order_detail(request, order_id):
         if action == "update_status":
             new_status = (request.POST.get("status") or "").strip().lower()
 
-            if new_status not in allowed_statuses:
-                messages.error(request, "Invalid status.")
+            if new_status == order.status:
+                messages.warning(request, "Status unchanged.")
             else:
-                order.status = new_status
-                order.save(update_fields=["status"])
-                messages.success(request, "Order status updated.")
+                try:
+                    order.transition(new_status, actor=request.user)
+                except ValueError as e:
+                    messages.error(request, str(e))
+                else:
+                    messages.success(request, "Order status updated.")
 
             return redirect("control:order_detail", order_id=order.id)
 
@@ -320,15 +390,15 @@ def order_detail(request, order_id):
 
             delivery_user = get_object_or_404(User, id=delivery_id)
 
-            order.delivery_person = delivery_user
-            order.status = "assigned"
-
-            if not order.delivery_code:
-                order.delivery_code = _generate_delivery_code()
-
-            order.save(update_fields=["delivery_person", "status", "delivery_code"])
-
-            messages.success(request, "Delivery assigned.")
+            try:
+                order.transition(
+                    "assigned", actor=request.user, delivery_person=delivery_user,
+                    delivery_code=order.delivery_code or _generate_delivery_code(),
+                )
+            except ValueError as e:
+                messages.error(request, str(e))
+            else:
+                messages.success(request, "Delivery assigned.")
             return redirect("control:order_detail", order_id=order.id)
 
         # ---------------------------
@@ -338,9 +408,12 @@ def order_detail(request, order_id):
             new_status = (request.POST.get("status") or "").strip().lower()
 
             if new_status in ["picked_up", "on_the_way", "delivered"]:
-                order.status = new_status
-                order.save(update_fields=["status"])
-                messages.success(request, "Delivery status updated.")
+                try:
+                    order.transition(new_status, actor=request.user)
+                except ValueError as e:
+                    messages.error(request, str(e))
+                else:
+                    messages.success(request, "Delivery status updated.")
 
             return redirect("control:order_detail", order_id=order.id)
 
@@ -348,18 +421,20 @@ def order_detail(request, order_id):
         # ADMIN VERIFY DELIVERY
         # ---------------------------
         elif action == "verify_delivery":
-            order.delivery_verified = True
-            order.status = "delivered"
-            order.save(update_fields=["delivery_verified", "status"])
-
-            messages.success(request, "Delivery verified.")
+            try:
+                order.transition("delivered", actor=request.user, delivery_verified=True)
+            except ValueError as e:
+                messages.error(request, str(e))
+            else:
+                messages.success(request, "Delivery verified.")
             return redirect("control:order_detail", order_id=order.id)
 
-    delivery_people = User.objects.filter(profile__is_delivery_guy=True)
+    delivery_people = riders()
 
     return render(request, "control/order_detail.html", {
         "order": order,
-        "allowed_statuses": sorted(list(allowed_statuses)),
+        "allowed_statuses": [order.status] + [s for s in allowed(order.status) if s != order.status],
+        "order_events": order.events.select_related("actor"),
         "delivery_people": delivery_people,
     })
 
@@ -379,10 +454,7 @@ def update_status(request, order_id):
     if request.method == "POST":
         new_status = request.POST.get("status")
         
-        # Debug: Log the current status and requested status
-        print(f"Current status: {order.status}, Requested status: {new_status}")
-        
-        # Define valid status transitions
+        # riders move one step at a time
         valid_transitions = {
             "assigned": ["picked_up"],
             "picked_up": ["on_the_way"],
@@ -391,9 +463,11 @@ def update_status(request, order_id):
         
         # Check if the transition is valid
         if new_status in valid_transitions.get(order.status, []):
-            old_status = order.status
-            order.status = new_status
-            order.save(update_fields=["status"])
+            try:
+                order.transition(new_status, actor=request.user)
+            except ValueError as e:
+                messages.error(request, str(e))
+                return redirect("delivery:dashboard")
             
             # Add success message based on status
             if new_status == "picked_up":
@@ -437,9 +511,11 @@ def verify_code(request, order_id):
             messages.error(request, f"Invalid delivery code. Expected: {order.delivery_code}")
             return redirect("delivery:dashboard")
 
-        order.status = "delivered"
-        order.delivery_verified = True
-        order.save(update_fields=["status", "delivery_verified"])
+        try:
+            order.transition("delivered", actor=request.user, delivery_verified=True)
+        except ValueError as e:
+            messages.error(request, str(e))
+            return redirect("delivery:dashboard")
 
         messages.success(request, f"Order #{order.id} delivery completed successfully!")
         return redirect("delivery:dashboard")
@@ -540,26 +616,6 @@ def food_edit(request, food_id):
 # =========================
 # WALLET TOPUPS
 # =========================
-def _credit_wallet_once(staff_user, topup) -> bool:
-    if hasattr(topup, "transaction") and topup.transaction is not None:
-        return False
-
-    wallet, _ = Wallet.objects.get_or_create(user=topup.user)
-
-    wallet.balance += topup.amount
-    wallet.save(update_fields=["balance", "updated_at"])
-
-    WalletTransaction.objects.create(
-        wallet=wallet,
-        tx_type="credit",
-        source="topup",
-        amount=topup.amount,
-        topup=topup,
-        note=f"Approved by {staff_user}",
-    )
-    return True
-
-
 @staff_required
 def topup_review(request, topup_id):
     topup = get_object_or_404(WalletTopUp, id=topup_id)
@@ -567,28 +623,150 @@ def topup_review(request, topup_id):
     if request.method == "POST":
         action = request.POST.get("action")
 
-        with transaction.atomic():
-            topup = WalletTopUp.objects.select_for_update().get(id=topup.id)
+        if action == "approve":
+            ledger.approve_topups([topup.id], request.user, note=f"Approved by {request.user}")
+        elif action == "reject":
+            ledger.reject_topups([topup.id], request.user)
+
+        return redirect("control:topups_list")
+
+    return render(request, "control/topup_review.html", {"topup": topup})
+
 
-            if action == "approve":
-                _credit_wallet_once(request.user, topup)
-                topup.status = "approved"
-            elif action == "reject":
-                topup.status = "rejected"
+TOPUP_BATCH_MAX = 500
 
-            topup.reviewed_by = request.user
-            topup.reviewed_at = timezone.now()
-            topup.save()
 
+@staff_required
+def topups_bulk(request):
+    """Approve or reject the top-ups ticked on the list page in one request."""
+    if request.method != "POST":
         return redirect("control:topups_list")
 
-    return render(request, "control/topup_review.html", {"topup": topup})
+    ids = [int(i) for i in request.POST.getlist("ids") if i.isdigit()][:TOPUP_BATCH_MAX]
+    action = request.POST.get("action")
+
+    if not ids:
+        messages.warning(request, "No top-ups selected.")
+    elif action in ("approve", "reject"):
+        if action == "approve":
+            done = ledger.approve_topups(ids, request.user, note=f"Approved by {request.user}")
+        else:
+            done = ledger.reject_topups(ids, request.user)
+        messages.success(request, f"{action.title()}d {done} top-up(s).")
+        if done < len(ids):
+            messages.info(request, f"Skipped {len(ids) - done} that were no longer pending.")
+    else:
+        messages.error(request, "Invalid action.")
+
+    next_url = request.POST.get("next")
+    if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        return redirect(next_url)
+    return redirect("control:topups_list")
 
 
 @staff_required
 def wallet_transactions(request):
-    txs = WalletTransaction.objects.select_related(
-        "wallet", "wallet__user", "order", "topup"
-    ).order_by("-created_at")[:400]
+    qs = WalletTransaction.objects.select_related("wallet", "wallet__user", "order", "topup")
+    page_obj = CursorPaginator(qs, 50).get_page(request.GET.get("after"), request.GET.get("before"))
+
+    return render(request, "control/transactions.html", {"txs": page_obj, "page_obj": page_obj})
+
+
+# =========================
+# EXPORTS
+# =========================
+# Every export reads plain dicts (values()) through iterator(), so rows are
+# fetched a chunk at a time and never become model instances; the response
+# starts with the header and streams as the cursor advances.
+EXPORT_CHUNK = 2000
+
+ORDER_EXPORT_FIELDS = [
+    "id", "created_at", "status", "customer", "phone", "delivery_address",
+    "total_amount", "payment_method", "is_paid", "rider", "delivery_verified",
+]
+ORDER_ITEM_EXPORT_FIELDS = [
+    "order_id", "created_at", "status", "food_id", "food_name", "quantity", "price_at_purchase", "line_total",
+]
+TRANSACTION_EXPORT_FIELDS = [
+    "id", "created_at", "wallet_id", "customer", "tx_type", "source",
+    "amount", "balance_after", "order_id", "topup_id", "note",
+]
+
+
+def _in_range(request, qs, field):
+    start, end = exports.day_range(request)
+    if start:
+        qs = qs.filter(**{f"{field}__gte": start})
+    if end:
+        qs = qs.filter(**{f"{field}__lt": end})
+    return qs
+
+
+def _order_status(request):
+    status = (request.GET.get("status") or "").strip().lower()
+    return status if status in dict(Order.STATUS_CHOICES) else ""
+
+
+@staff_required
+def export_orders(request):
+    """Orders created ?from= to ?to= (inclusive days), optionally one ?status=."""
+    qs = _in_range(request, Order.objects.all(), "created_at")
+    status = _order_status(request)
+    if status:
+        qs = qs.filter(status=status)
 
-    return render(request, "control/transactions.html", {"txs": txs})
\ No newline at end of file
+    rows = (
+        qs.order_by("created_at", "id")
+        .values(
+            "id", "created_at", "status", "phone", "delivery_address", "total_amount",
+            "payment_method", "is_paid", "delivery_verified",
+            customer=F("user__username"), rider=F("delivery_person__username"),
+        )
+        .iterator(chunk_size=EXPORT_CHUNK)
+    )
+    return exports.stream(request, rows, ORDER_EXPORT_FIELDS, "orders")
+
+
+@staff_required
+def export_order_items(request):
+    """One row per order line, filtered by its order's date and status."""
+    qs = _in_range(request, OrderItem.objects.all(), "order__created_at")
+    status = _order_status(request)
+    if status:
+        qs = qs.filter(order__status=status)
+
+    rows = (
+        qs.order_by("order_id", "id")
+        .values(
+            "order_id", "food_id", "quantity", "price_at_purchase",
+            created_at=F("order__created_at"), status=F("order__status"), food_name=F("food__name"),
+            line_total=ExpressionWrapper(
+                F("price_at_purchase") * F("quantity"), output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+        )
+        .iterator(chunk_size=EXPORT_CHUNK)
+    )
+    return exports.stream(request, rows, ORDER_ITEM_EXPORT_FIELDS, "order-items")
+
+
+@staff_required
+def export_wallet_transactions(request):
+    """Ledger rows created ?from= to ?to=, optionally one ?type= and/or ?source=."""
+    qs = _in_range(request, WalletTransaction.objects.all(), "created_at")
+    tx_type = request.GET.get("type")
+    if tx_type in dict(WalletTransaction.TYPE_CHOICES):
+        qs = qs.filter(tx_type=tx_type)
+    source = request.GET.get("source")
+    if source in dict(WalletTransaction.SOURCE_CHOICES):
+        qs = qs.filter(source=source)
+
+    rows = (
+        qs.order_by("created_at", "id")
+        .values(
+            "id", "created_at", "wallet_id", "tx_type", "source", "amount",
+            "balance_after", "order_id", "topup_id", "note",
+            customer=F("wallet__user__username"),
+        )
+        .iterator(chunk_size=EXPORT_CHUNK)
+    )
+    return exports.stream(request, rows, TRANSACTION_EXPORT_FIELDS, "wallet-transactions")
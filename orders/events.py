@@ -0,0 +1,124 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Order
+
+
+class Subscription:
+    """One listener's queue on a channel; only read it from its own event loop."""
+
+    def __init__(self, broker, channel, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def deliver(self, event):
+        # runs on self.loop; a stalled listener loses its oldest events, never blocks publishers
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout):
+        """Next event, or None after `timeout` seconds of silence."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """
+    Fan-out between threads and event loops of this process only. Other
+    backends (Redis pub/sub, Postgres LISTEN/NOTIFY...) implement the same
+    publish/subscribe/unsubscribe and are picked with ORDER_EVENTS_BROKER.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._channels = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub.deliver, event)
+            except RuntimeError:
+                # the listener's loop is gone
+                self.unsubscribe(sub)
+
+    def subscribe(self, channel):
+        sub = Subscription(self, channel, self.queue_size)
+        with self._lock:
+            self._channels[channel].add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subscribers = self._channels.get(sub.channel)
+            if subscribers is not None:
+                subscribers.discard(sub)
+                if not subscribers:
+                    del self._channels[sub.channel]
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    path = getattr(settings, "ORDER_EVENTS_BROKER", "orders.events.InProcessBroker")
+    return import_string(path)()
+
+
+def streaming():
+    """
+    True when live updates are served as Server-Sent Events, which only
+    works under ASGI. Otherwise pages poll a JSON view every POLL_SECONDS.
+    """
+    return getattr(settings, "ORDER_EVENTS_STREAMING", False)
+
+
+POLL_SECONDS = getattr(settings, "ORDER_EVENTS_POLL_SECONDS", 10)
+
+
+# every order creation and status change, for the staff live board
+STAFF_CHANNEL = "staff:orders"
+
+
+def order_channel(order_id):
+    return f"order:{order_id}"
+
+
+def status_event(order_id, status, previous=None):
+    return {
+        "order_id": order_id,
+        "status": status,
+        "status_display": dict(Order.STATUS_CHOICES).get(status, status),
+        "previous": previous,
+        "at": timezone.now().isoformat(),
+    }
+
+
+def publish(channel, event):
+    get_broker().publish(channel, event)
+
+
+def publish_on_commit(channel, event):
+    """Listeners must never hear about a write that was rolled back."""
+    transaction.on_commit(lambda: publish(channel, event))
+
+
+def sse(event, data):
+    """One Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
@@ -0,0 +1,61 @@
+import uuid
+from datetime import timedelta
+
+from django.shortcuts import redirect
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+KEY_FIELD = "idempotency_key"
+KEY_TTL = timedelta(hours=24)
+
+
+def issue_key(request=None):
+    """Token for a form; re-rendered forms keep the one they were posted with."""
+    if request is not None and request.method == "POST":
+        posted = (request.POST.get(KEY_FIELD) or "").strip()
+        if posted:
+            return posted[:32]
+    return uuid.uuid4().hex
+
+
+def replayed_response(request, scope):
+    """Redirect to the original result if this POST was already handled, else None."""
+    key = (request.POST.get(KEY_FIELD) or "").strip()
+    if not key:
+        return None
+
+    result_url = (
+        IdempotencyKey.objects.filter(
+            key=key[:32], user=request.user, scope=scope, expires_at__gt=timezone.now()
+        )
+        .values_list("result_url", flat=True)
+        .first()
+    )
+    return redirect(result_url) if result_url else None
+
+
+def remember_result(request, scope, result_url):
+    """
+    Record the result of this POST. Call inside the transaction doing the
+    work, before the work: a concurrent duplicate then blocks on the key
+    until ours commits, fails with IntegrityError and rolls back.
+    """
+    key = (request.POST.get(KEY_FIELD) or "").strip()
+    if not key:
+        return
+
+    IdempotencyKey.objects.create(
+        key=key[:32],
+        user=request.user,
+        scope=scope,
+        result_url=result_url,
+        expires_at=timezone.now() + KEY_TTL,
+    )
+
+
+def update_result(request, scope, result_url):
+    """Point a key claimed with remember_result() at a result known only after the work."""
+    key = (request.POST.get(KEY_FIELD) or "").strip()
+    if key:
+        IdempotencyKey.objects.filter(key=key[:32], user=request.user, scope=scope).update(result_url=result_url)
@@ -0,0 +1,106 @@
+import logging
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# A running job whose worker hasn't finished it in this long is presumed dead.
+LOCK_TIMEOUT = timedelta(seconds=getattr(settings, "JOBS_LOCK_TIMEOUT", 600))
+RETRY_DELAY = 10  # seconds, doubled on every attempt
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue(func, *, priority=0, delay=None, max_attempts=3, **kwargs):
+    """
+    Queue `func(**kwargs)`. `func` is a callable or its dotted path; kwargs
+    must be JSON-serialisable. The row is part of the caller's transaction,
+    so a rolled back request never leaves a job behind.
+    """
+    if callable(func):
+        func = f"{func.__module__}.{func.__qualname__}"
+    return Job.objects.create(
+        func=func,
+        kwargs=kwargs,
+        priority=priority,
+        run_at=timezone.now() + (delay or timedelta()),
+        max_attempts=max_attempts,
+    )
+
+
+# =========================
+# WORKER SIDE
+# =========================
+def claim(worker, limit=1):
+    """
+    Mark up to `limit` due jobs as running for `worker` and return their ids.
+    Uses SELECT ... FOR UPDATE SKIP LOCKED where the backend has it. SQLite
+    gets one UPDATE ... WHERE id IN (SELECT ... LIMIT n): a single statement
+    takes the write lock up front, so two workers can't claim the same row.
+    """
+    now = timezone.now()
+    due = Job.objects.filter(status="queued", run_at__lte=now).order_by("-priority", "run_at", "id")
+    claimed = {"status": "running", "locked_by": worker, "locked_at": now, "attempts": F("attempts") + 1}
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(due.select_for_update(skip_locked=True).values_list("id", flat=True)[:limit])
+            Job.objects.filter(id__in=ids).update(**claimed)
+        return ids
+
+    Job.objects.filter(id__in=due.values("id")[:limit], status="queued").update(**claimed)
+    return list(
+        Job.objects.filter(status="running", locked_by=worker, locked_at=now)
+        .order_by("-priority", "run_at", "id")
+        .values_list("id", flat=True)
+    )
+
+
+def run(job_id):
+    """Run one claimed job and record the outcome. Returns the new status."""
+    job = Job.objects.get(pk=job_id)
+    try:
+        import_string(job.func)(**job.kwargs)
+    except Exception:
+        return _failed(job, traceback.format_exc())
+
+    Job.objects.filter(pk=job.pk).update(status="done", finished_at=timezone.now(), last_error="")
+    return "done"
+
+
+def _failed(job, error):
+    logger.warning("Job #%s %s failed (attempt %s/%s)", job.pk, job.func, job.attempts, job.max_attempts)
+    if job.attempts < job.max_attempts:
+        retry_at = timezone.now() + timedelta(seconds=RETRY_DELAY * 2 ** (job.attempts - 1))
+        Job.objects.filter(pk=job.pk).update(status="queued", run_at=retry_at, last_error=error)
+        return "queued"
+
+    Job.objects.filter(pk=job.pk).update(status="failed", finished_at=timezone.now(), last_error=error)
+    return "failed"
+
+
+def requeue_stale():
+    """Put jobs whose worker died mid-run back in the queue (or fail them)."""
+    stale = Job.objects.filter(status="running", locked_at__lt=timezone.now() - LOCK_TIMEOUT)
+    stale.filter(attempts__gte=F("max_attempts")).update(
+        status="failed", finished_at=timezone.now(), last_error="Worker died while running the job.",
+    )
+    return stale.update(status="queued", locked_by="", locked_at=None)
+
+
+def purge(older_than=timedelta(days=7)):
+    return Job.objects.filter(
+        status="done", finished_at__lt=timezone.now() - older_than
+    ).delete()[0]
@@ -0,0 +1,25 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Backfill or rebuild the daily sales/food rollups from orders."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="First day to rebuild (YYYY-MM-DD). Default: all history.")
+        parser.add_argument("--until", help="Last day to rebuild (YYYY-MM-DD). Default: today.")
+
+    def handle(self, *args, **options):
+        try:
+            since = date.fromisoformat(options["since"]) if options["since"] else None
+            until = date.fromisoformat(options["until"]) if options["until"] else None
+        except ValueError as e:
+            raise CommandError(f"Invalid date: {e}")
+
+        sales_rows, food_rows = rebuild(since=since, until=until)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {sales_rows} sales rollup row(s) and {food_rows} food rollup row(s)."
+        ))
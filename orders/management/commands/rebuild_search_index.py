@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from orders.search import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the staff search index for orders and wallet top-ups."
+
+    def handle(self, *args, **options):
+        orders, topups = rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {orders} order(s) and {topups} top-up(s)."
+        ))
@@ -0,0 +1,72 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from orders import jobs
+
+
+def _run(job_id):
+    # pool threads/processes keep their own connections; keep them healthy
+    close_old_connections()
+    try:
+        return jobs.run(job_id)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (orders.jobs) until interrupted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument("--processes", action="store_true", help="Use a process pool instead of threads.")
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is empty.")
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options["concurrency"])
+        worker = jobs.worker_name()
+
+        if options["processes"]:
+            # spawned/forkserver children start without Django configured; the
+            # initializer is django.setup itself, since unpickling anything
+            # from this module would import the models before setup runs
+            connections.close_all()
+            pool = ProcessPoolExecutor(max_workers=concurrency, initializer=django.setup)
+        else:
+            pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="job")
+
+        self.stdout.write(f"Worker {worker} started ({concurrency} {'processes' if options['processes'] else 'threads'}).")
+        running = {}
+        stale_check = 0
+        try:
+            while True:
+                if time.monotonic() - stale_check > 60:
+                    stale_check = time.monotonic()
+                    if jobs.requeue_stale():
+                        self.stdout.write("Requeued stale jobs.")
+
+                free = concurrency - len(running)
+                for job_id in jobs.claim(worker, free) if free else []:
+                    running[pool.submit(_run, job_id)] = job_id
+
+                if running:
+                    done, _ = wait(running, timeout=options["sleep"], return_when=FIRST_COMPLETED)
+                    for future in done:
+                        job_id = running.pop(future)
+                        try:
+                            self.stdout.write(f"Job #{job_id}: {future.result()}")
+                        except Exception as e:
+                            self.stderr.write(f"Job #{job_id}: worker error {e!r}")
+                    continue
+
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping; waiting for running jobs...")
+        finally:
+            pool.shutdown(wait=True)
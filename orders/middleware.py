@@ -0,0 +1,15 @@
+from .shopper import ShopperState
+
+
+class ShopperStateMiddleware:
+    """
+    Attaches a lazy `request.shopper` (cart count, wallet balance, cart
+    quantities). Must come after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.shopper = ShopperState(request.user)
+        return self.get_response(request)
@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+
+def backfill_cart_totals(apps, schema_editor):
+    Cart = apps.get_model("orders", "Cart")
+    CartItem = apps.get_model("orders", "CartItem")
+
+    totals = {}
+    for cart_id, quantity, price in CartItem.objects.values_list("cart_id", "quantity", "food__price"):
+        count, subtotal = totals.get(cart_id, (0, 0))
+        totals[cart_id] = (count + quantity, subtotal + quantity * price)
+
+    for cart_id, (count, subtotal) in totals.items():
+        Cart.objects.filter(pk=cart_id).update(item_count=count, subtotal=subtotal)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_delivery_code_order_delivery_person_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(backfill_cart_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Count, DecimalField, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+ZERO = Decimal("0.00")
+
+
+def backfill_rollups(apps, schema_editor):
+    # 0006 created the tables empty; fill them from existing orders, as
+    # orders.rollups.rebuild() does, but against the historical models
+    Order = apps.get_model("orders", "Order")
+    OrderItem = apps.get_model("orders", "OrderItem")
+    DailySalesRollup = apps.get_model("orders", "DailySalesRollup")
+    DailyFoodRollup = apps.get_model("orders", "DailyFoodRollup")
+    money = DecimalField(max_digits=14, decimal_places=2)
+
+    sales = (
+        Order.objects.annotate(day=TruncDate("created_at"))
+        .values("day", "status")
+        .annotate(
+            n=Count("id"),
+            total=Coalesce(Sum("total_amount"), ZERO, output_field=money),
+            paid_n=Count("id", filter=Q(is_paid=True)),
+            paid_total=Coalesce(Sum("total_amount", filter=Q(is_paid=True)), ZERO, output_field=money),
+        )
+        .order_by()
+    )
+    foods = (
+        OrderItem.objects.annotate(day=TruncDate("order__created_at"))
+        .values("day", "food_id")
+        .annotate(
+            qty=Coalesce(Sum("quantity"), 0),
+            total=Coalesce(Sum(F("quantity") * F("price_at_purchase"), output_field=money), ZERO, output_field=money),
+        )
+        .order_by()
+    )
+
+    DailySalesRollup.objects.all().delete()
+    DailyFoodRollup.objects.all().delete()
+    DailySalesRollup.objects.bulk_create(
+        [
+            DailySalesRollup(
+                day=r["day"], status=r["status"],
+                orders=r["n"], amount=r["total"],
+                paid_orders=r["paid_n"], paid_amount=r["paid_total"],
+            )
+            for r in sales.iterator()
+        ],
+        batch_size=1000,
+    )
+    DailyFoodRollup.objects.bulk_create(
+        [
+            DailyFoodRollup(day=r["day"], food_id=r["food_id"], quantity=r["qty"], amount=r["total"])
+            for r in foods.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0011_order_event'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.db import migrations
+
+BATCH = 2000
+
+
+def backfill_search_index(apps, schema_editor):
+    # 0009 created the table empty; index existing orders and top-ups with
+    # the historical models. tokenize() is a pure function, so the live one
+    # is used: the tokens must match what search queries look up.
+    from orders.search import tokenize
+
+    SearchToken = apps.get_model("orders", "SearchToken")
+    sources = (
+        ("order", apps.get_model("orders", "Order"), "phone"),
+        ("topup", apps.get_model("wallet", "WalletTopUp"), "reference"),
+    )
+    for kind, model, field in sources:
+        SearchToken.objects.filter(kind=kind).delete()
+        rows = model.objects.values_list("pk", field, "user__username", "user__email").order_by("pk")
+        last_pk = 0
+        while True:
+            chunk = list(rows.filter(pk__gt=last_pk)[:BATCH])
+            if not chunk:
+                break
+            SearchToken.objects.bulk_create(
+                [
+                    SearchToken(kind=kind, object_id=pk, token=token)
+                    for pk, value, username, email in chunk
+                    for token in tokenize(username, email, value)
+                ],
+                batch_size=1000,
+            )
+            last_pk = chunk[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0012_backfill_sales_rollups'),
+        # WalletTopUp.reference and .user as read above date from wallet 0001
+        ('wallet', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
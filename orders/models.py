@@ -1,17 +1,60 @@
 from django.conf import settings
+from decimal import Decimal
 from django.db import models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from menu.models import FoodItem
 from django.contrib.auth.models import User
 import random
 import string
 
+class CartQuerySet(models.QuerySet):
+    def recalculate_totals(self):
+        """Rebuild item_count/subtotal from the cart lines in one UPDATE."""
+        lines = CartItem.objects.filter(cart=OuterRef("pk")).values("cart")
+        money = models.DecimalField(max_digits=12, decimal_places=2)
+        return self.update(
+            item_count=Coalesce(
+                Subquery(lines.annotate(n=Sum("quantity")).values("n")), 0
+            ),
+            subtotal=Coalesce(
+                Subquery(
+                    lines.annotate(v=Sum(F("quantity") * F("food__price"), output_field=money)).values("v")
+                ),
+                Value(Decimal("0.00")),
+                output_field=money,
+            ),
+        )
+
+
 class Cart(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="carts")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Denormalized from CartItem; kept in step by bump_totals()
+    item_count = models.PositiveIntegerField(default=0)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    objects = CartQuerySet.as_manager()
+
     def __str__(self) -> str:
         return f"Cart #{self.id} ({self.user})"
 
+    def bump_totals(self, quantity, price):
+        """
+        Shift the counters by `quantity` units (negative to remove) at `price`.
+        Call inside the same transaction as the CartItem change.
+        """
+        if quantity:
+            Cart.objects.filter(pk=self.pk).update(
+                item_count=F("item_count") + quantity,
+                subtotal=F("subtotal") + price * quantity,
+            )
+
+    def reset_totals(self):
+        Cart.objects.filter(pk=self.pk).update(item_count=0, subtotal=Decimal("0.00"))
+
 
 class CartItem(models.Model):
     cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name="items")
@@ -81,6 +124,13 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="order_user_created_idx"),
+            models.Index(fields=["status", "-created_at"], name="order_status_created_idx"),
+            models.Index(fields=["delivery_person", "status", "-created_at"], name="order_rider_status_idx"),
+            models.Index(fields=["is_paid", "created_at"], name="order_paid_created_idx"),
+            models.Index(fields=["-created_at", "-id"], name="order_created_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"Order #{self.id} ({self.user})"
@@ -93,6 +143,30 @@ class Order(models.Model):
             self.delivery_code = ''.join(random.choices(string.digits, k=6))
         super().save(*args, **kwargs)
 
+    def transition(self, to, *, actor=None, **fields):
+        """Change status through the state machine; see orders.transitions.transition."""
+        from .transitions import transition
+        return transition(self, to, actor=actor, **fields)
+
+class OrderEvent(models.Model):
+    """Append-only log of Order status changes (see orders.transitions)."""
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="events")
+    from_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES, blank=True)  # "" when placed
+    to_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["order", "id"], name="order_event_order_idx"),
+            models.Index(fields=["to_status", "created_at"], name="order_event_status_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Order #{self.order_id} {self.from_status or '-'} -> {self.to_status}"
+
+
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
     food = models.ForeignKey(FoodItem, on_delete=models.PROTECT)
@@ -101,4 +175,115 @@ class OrderItem(models.Model):
 
     @property
     def line_total(self):
-        return self.price_at_purchase * self.quantity
\ No newline at end of file
+        return self.price_at_purchase * self.quantity
+
+
+class DailySalesRollup(models.Model):
+    """Orders per (day, status), kept in step with Order saves (see orders.rollups)."""
+    day = models.DateField()
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    orders = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    paid_orders = models.IntegerField(default=0)
+    paid_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ["-day", "status"]
+        constraints = [
+            models.UniqueConstraint(fields=["day", "status"], name="uniq_sales_rollup_day_status"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.day} {self.status}: {self.orders}"
+
+
+class DailyFoodRollup(models.Model):
+    """Units sold per (day, food), kept in step with OrderItem writes."""
+    day = models.DateField()
+    food = models.ForeignKey(FoodItem, on_delete=models.CASCADE, related_name="+")
+    quantity = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ["-day"]
+        constraints = [
+            models.UniqueConstraint(fields=["day", "food"], name="uniq_food_rollup_day_food"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.day} {self.food_id}: {self.quantity}"
+
+
+class IdempotencyKey(models.Model):
+    """
+    One row per form submission token, so a replayed POST can be answered
+    with the original redirect instead of redoing the work.
+    """
+    SCOPE_CHOICES = [
+        ("checkout", "Checkout"),
+        ("topup", "Wallet top-up"),
+    ]
+
+    key = models.CharField(max_length=32, unique=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    scope = models.CharField(max_length=20, choices=SCOPE_CHOICES)
+    result_url = models.CharField(max_length=200)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self) -> str:
+        return f"{self.scope} {self.key}"
+
+
+class SearchToken(models.Model):
+    """
+    Lower-cased words from searchable fields (see orders.search), looked up
+    by indexed prefix range instead of icontains scans.
+    """
+    KIND_CHOICES = [
+        ("order", "Order"),
+        ("topup", "Wallet top-up"),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    token = models.CharField(max_length=64)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["kind", "token"], name="search_kind_token_idx"),
+            models.Index(fields=["kind", "object_id"], name="search_kind_object_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{self.object_id} {self.token}"
+
+
+class Job(models.Model):
+    """A queued call to `func` (dotted path) run by `manage.py runworker`, see orders.jobs."""
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    func = models.CharField(max_length=200)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    priority = models.SmallIntegerField(default=0)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    last_error = models.TextField(blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "-priority", "run_at"], name="job_claim_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Job #{self.id} {self.func} ({self.status})"
@@ -0,0 +1,117 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class CursorPage:
+    """A page of results plus opaque cursors for its neighbours."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+class CursorPaginator:
+    """
+    Keyset pagination over a unique ordering (default newest first by
+    created_at, id). Every page is one indexed range query, with no
+    COUNT(*) and no OFFSET, so page N costs the same as page 1.
+
+    Pass `?after=<cursor>` for the next page, `?before=<cursor>` for the
+    previous one.
+    """
+
+    def __init__(self, queryset, per_page=25, ordering=("-created_at", "-id")):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+
+    def get_page(self, after=None, before=None):
+        values = self._decode(before) if before else None
+        if values is not None:
+            return self._page_before(values)
+        return self._page_after(self._decode(after) if after else None)
+
+    def _page_after(self, values):
+        qs = self.queryset.order_by(*self.ordering)
+        if values is not None:
+            qs = qs.filter(self._seek(values, forward=True))
+
+        rows = list(qs[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+
+        return CursorPage(
+            rows,
+            next_cursor=self._encode(rows[-1]) if has_more else None,
+            previous_cursor=self._encode(rows[0]) if values is not None and rows else None,
+        )
+
+    def _page_before(self, values):
+        reverse = tuple(f[1:] if f.startswith("-") else f"-{f}" for f in self.ordering)
+        qs = self.queryset.order_by(*reverse).filter(self._seek(values, forward=False))
+
+        rows = list(qs[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page][::-1]
+
+        return CursorPage(
+            rows,
+            next_cursor=self._encode(rows[-1]) if rows else None,
+            previous_cursor=self._encode(rows[0]) if has_more else None,
+        )
+
+    def _seek(self, values, forward):
+        """Rows strictly after (forward) or before `values` in display order."""
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            name = field.lstrip("-")
+            op = "lt" if field.startswith("-") == forward else "gt"
+            step = Q(**{f"{name}__{op}": values[i]})
+            for prev, prev_value in zip(self.ordering[:i], values[:i]):
+                step &= Q(**{prev.lstrip("-"): prev_value})
+            condition |= step
+        return condition
+
+    def _encode(self, obj):
+        raw = [str(getattr(obj, f.lstrip("-"))) for f in self.ordering]
+        return base64.urlsafe_b64encode(json.dumps(raw).encode()).decode().rstrip("=")
+
+    def _decode(self, cursor):
+        """Cursor -> typed ordering values, or None if it's malformed."""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(raw, list) or len(raw) != len(self.ordering):
+                return None
+            opts = self.queryset.model._meta
+            return [
+                opts.get_field(f.lstrip("-")).to_python(v)
+                for f, v in zip(self.ordering, raw)
+            ]
+        except (ValueError, TypeError, binascii.Error, ValidationError):
+            return None
@@ -0,0 +1,164 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DecimalField, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import DailyFoodRollup, DailySalesRollup, Order, OrderItem
+
+ZERO = Decimal("0.00")
+
+
+def order_day(order):
+    return timezone.localdate(order.created_at)
+
+
+def _bump(model, key, **deltas):
+    """Add `deltas` to the rollup row for `key`, creating it on first use."""
+    deltas = {f: v for f, v in deltas.items() if v}
+    if not deltas:
+        return
+
+    changes = {f: F(f) + v for f, v in deltas.items()}
+    with transaction.atomic():
+        if model.objects.filter(**key).update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                model.objects.create(**key, **deltas)
+        except IntegrityError:
+            model.objects.filter(**key).update(**changes)
+
+
+def _bump_many(model, key, field, deltas):
+    """
+    `_bump` for many rows that share `key` and differ in `field`, where
+    `deltas` is {field value: {column: delta}}: one read of which rows
+    exist, one UPDATE for those (a CASE per column), one INSERT for the rest.
+    """
+    if not deltas:
+        return
+
+    columns = sorted({c for d in deltas.values() for c in d})
+    rows = model.objects.filter(**key)
+    with transaction.atomic():
+        existing = set(rows.filter(**{f"{field}__in": list(deltas)}).values_list(field, flat=True))
+        if existing:
+            rows.filter(**{f"{field}__in": existing}).update(**{
+                c: F(c) + Case(
+                    *[When(**{field: v}, then=Value(deltas[v].get(c, 0))) for v in existing],
+                    default=Value(0),
+                    output_field=model._meta.get_field(c).clone(),
+                )
+                for c in columns
+            })
+
+        missing = [v for v in deltas if v not in existing]
+        if not missing:
+            return
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([model(**key, **{field: v}, **deltas[v]) for v in missing])
+        except IntegrityError:
+            # another writer created some of them since the read
+            for v in missing:
+                _bump(model, {**key, field: v}, **deltas[v])
+
+
+# =========================
+# INCREMENTAL MAINTENANCE
+# =========================
+def add_order(day, status, amount, is_paid, sign=1):
+    _bump(
+        DailySalesRollup, {"day": day, "status": status},
+        orders=sign,
+        amount=sign * amount,
+        paid_orders=sign if is_paid else 0,
+        paid_amount=sign * amount if is_paid else 0,
+    )
+
+
+def add_item(day, food_id, quantity, price, sign=1):
+    _bump(
+        DailyFoodRollup, {"day": day, "food_id": food_id},
+        quantity=sign * quantity,
+        amount=sign * quantity * price,
+    )
+
+
+def record_items(order, items):
+    """
+    For OrderItem rows written with bulk_create (no post_save): lines are
+    summed per food and written together, so a bigger cart adds no queries.
+    """
+    per_food = defaultdict(lambda: {"quantity": 0, "amount": ZERO})
+    for i in items:
+        per_food[i.food_id]["quantity"] += i.quantity
+        per_food[i.food_id]["amount"] += i.quantity * i.price_at_purchase
+    _bump_many(DailyFoodRollup, {"day": order_day(order)}, "food_id", per_food)
+
+
+# =========================
+# REBUILD
+# =========================
+def rebuild(since=None, until=None):
+    """
+    Recompute rollups for days in [since, until] (inclusive, either open)
+    from Order/OrderItem. Returns (sales_rows, food_rows).
+    """
+    day_range = {}
+    if since:
+        day_range["day__gte"] = since
+    if until:
+        day_range["day__lte"] = until
+
+    money = DecimalField(max_digits=14, decimal_places=2)
+
+    orders = Order.objects.annotate(day=TruncDate("created_at")).filter(**day_range)
+    sales = (
+        orders.values("day", "status")
+        .annotate(
+            n=Count("id"),
+            total=Coalesce(Sum("total_amount"), ZERO, output_field=money),
+            paid_n=Count("id", filter=Q(is_paid=True)),
+            paid_total=Coalesce(Sum("total_amount", filter=Q(is_paid=True)), ZERO, output_field=money),
+        )
+        .order_by()
+    )
+
+    items = OrderItem.objects.annotate(day=TruncDate("order__created_at")).filter(**day_range)
+    foods = (
+        items.values("day", "food_id")
+        .annotate(
+            qty=Coalesce(Sum("quantity"), 0),
+            total=Coalesce(Sum(F("quantity") * F("price_at_purchase"), output_field=money), ZERO, output_field=money),
+        )
+        .order_by()
+    )
+
+    with transaction.atomic():
+        DailySalesRollup.objects.filter(**day_range).delete()
+        DailyFoodRollup.objects.filter(**day_range).delete()
+
+        sales_rows = DailySalesRollup.objects.bulk_create(
+            [
+                DailySalesRollup(
+                    day=r["day"], status=r["status"],
+                    orders=r["n"], amount=r["total"],
+                    paid_orders=r["paid_n"], paid_amount=r["paid_total"],
+                )
+                for r in sales.iterator()
+            ],
+            batch_size=1000,
+        )
+        food_rows = DailyFoodRollup.objects.bulk_create(
+            [
+                DailyFoodRollup(day=r["day"], food_id=r["food_id"], quantity=r["qty"], amount=r["total"])
+                for r in foods.iterator()
+            ],
+            batch_size=1000,
+        )
+
+    return len(sales_rows), len(food_rows)
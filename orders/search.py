@@ -0,0 +1,156 @@
+import re
+
+from django.db import transaction
+from django.db.models import Case, IntegerField, Max, Q, When
+
+from wallet.models import WalletTopUp
+from .models import Order, SearchToken
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+MAX_TOKEN = 64
+MAX_TERMS = 6
+RESULT_LIMIT = 100
+
+# Tokens are [a-z0-9] only, so every token starting with `t` sorts in
+# [t, t + HIGH): a plain B-tree range scan on (kind, token).
+HIGH = "\uffff"
+
+
+def tokenize(*values):
+    tokens = set()
+    for value in values:
+        if not value:
+            continue
+        text = str(value).lower()
+        words = WORD_RE.findall(text)
+        tokens.update(words)
+
+        # "0803 123 4567" should also match "08031234567"
+        digits = "".join(ch for ch in text if ch.isdigit())
+        if len(words) > 1 and len(digits) > 3:
+            tokens.add(digits)
+    return {t[:MAX_TOKEN] for t in tokens}
+
+
+# =========================
+# INDEXING
+# =========================
+def _order_tokens(order):
+    return tokenize(order.user.username, order.user.email, order.phone)
+
+
+def _topup_tokens(topup):
+    return tokenize(topup.user.username, topup.user.email, topup.reference)
+
+
+def _replace(kind, rows):
+    """rows: [(object_id, tokens)] -> swap in the new tokens for those objects."""
+    rows = list(rows)
+    if not rows:
+        return
+    with transaction.atomic():
+        SearchToken.objects.filter(kind=kind, object_id__in=[pk for pk, _ in rows]).delete()
+        SearchToken.objects.bulk_create(
+            [SearchToken(kind=kind, object_id=pk, token=t) for pk, tokens in rows for t in tokens],
+            batch_size=1000,
+        )
+
+
+def index_orders(orders):
+    _replace("order", ((o.pk, _order_tokens(o)) for o in orders))
+
+
+def index_topups(topups):
+    _replace("topup", ((t.pk, _topup_tokens(t)) for t in topups))
+
+
+def unindex(kind, object_id):
+    SearchToken.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def reindex_user(user):
+    """Username/email are copied into every order and top-up of the user."""
+    index_orders(Order.objects.filter(user=user).select_related("user"))
+    index_topups(WalletTopUp.objects.filter(user=user).select_related("user"))
+
+
+# =========================
+# QUERYING
+# =========================
+def ranked_ids(kind, q, limit=RESULT_LIMIT):
+    """
+    Ids whose tokens match every word of `q` (exact or prefix), best first:
+    exact word matches outrank prefix matches, newer objects break ties.
+    A bare number (optionally "#123") is also tried as the object id.
+    """
+    q = (q or "").strip().lower()
+    terms = WORD_RE.findall(q)[:MAX_TERMS]
+
+    exact_id = int(q.lstrip("#")) if q.lstrip("#").isdigit() else None
+    ids = [exact_id] if exact_id is not None else []
+
+    if terms:
+        any_term = Q()
+        per_term = {}
+        for i, term in enumerate(terms):
+            in_range = Q(token__gte=term, token__lt=term + HIGH)
+            any_term |= in_range
+            per_term[f"t{i}"] = Max(Case(
+                When(token=term, then=2),
+                When(in_range, then=1),
+                default=0,
+                output_field=IntegerField(),
+            ))
+
+        score = None
+        for name in per_term:
+            score = per_term[name] if score is None else score + per_term[name]
+
+        matches = (
+            SearchToken.objects.filter(kind=kind)
+            .filter(any_term)
+            .values("object_id")
+            .annotate(**per_term)
+            .filter(**{f"{name}__gt": 0 for name in per_term})
+            .annotate(score=score)
+            .order_by("-score", "-object_id")
+            .values_list("object_id", flat=True)[:limit]
+        )
+        ids += [pk for pk in matches if pk != exact_id]
+
+    return ids
+
+
+def search(queryset, kind, q, limit=RESULT_LIMIT):
+    """`queryset` rows matching `q`, in ranked order."""
+    ids = ranked_ids(kind, q, limit)
+    if not ids:
+        return []
+    found = queryset.in_bulk(ids)
+    return [found[pk] for pk in ids if pk in found]
+
+
+# =========================
+# REBUILD
+# =========================
+def rebuild(batch=2000):
+    """Drop and rebuild the whole index. Returns (orders, topups) indexed."""
+    counts = []
+    sources = (
+        ("order", Order, index_orders, "phone"),
+        ("topup", WalletTopUp, index_topups, "reference"),
+    )
+    for kind, model, index, field in sources:
+        SearchToken.objects.filter(kind=kind).delete()
+        # only the indexed columns
+        qs = model.objects.select_related("user").only(field, "user__username", "user__email").order_by("pk")
+        done, last_pk = 0, 0
+        while True:
+            chunk = list(qs.filter(pk__gt=last_pk)[:batch])
+            if not chunk:
+                break
+            index(chunk)
+            done += len(chunk)
+            last_pk = chunk[-1].pk
+        counts.append(done)
+    return tuple(counts)
@@ -0,0 +1,77 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db.models import OuterRef, Subquery
+from django.utils.functional import cached_property
+
+from wallet.models import Wallet
+from .models import Cart, CartItem
+
+
+class ShopperState:
+    """
+    Cart and wallet summary for the current request.
+    Loaded on first access with a single query and shared by the context
+    processors and views for the rest of the request.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def _summary(self):
+        empty = {"cart_id": None, "cart_count": 0, "wallet_balance": Decimal("0.00")}
+        if not self.user.is_authenticated:
+            return empty
+
+        first_cart = Cart.objects.filter(user=OuterRef("pk")).order_by("pk")
+        balance = Wallet.objects.filter(user=OuterRef("pk")).values("balance")[:1]
+
+        row = (
+            get_user_model().objects.filter(pk=self.user.pk)
+            .annotate(
+                cart_id=Subquery(first_cart.values("pk")[:1]),
+                cart_count=Subquery(first_cart.values("item_count")[:1]),
+                wallet_balance=Subquery(balance),
+            )
+            .values("cart_id", "cart_count", "wallet_balance")
+            .first()
+        )
+        if row is None:
+            return empty
+
+        return {
+            "cart_id": row["cart_id"],
+            "cart_count": row["cart_count"] or 0,
+            "wallet_balance": row["wallet_balance"] if row["wallet_balance"] is not None else Decimal("0.00"),
+        }
+
+    @property
+    def cart_id(self):
+        return self._summary["cart_id"]
+
+    @property
+    def cart_count(self):
+        return self._summary["cart_count"]
+
+    @property
+    def wallet_balance(self):
+        return self._summary["wallet_balance"]
+
+    @cached_property
+    def cart_quantities(self):
+        """{food_id: quantity} for the shopper's cart."""
+        if self.cart_id is None:
+            return {}
+        return dict(CartItem.objects.filter(cart_id=self.cart_id).values_list("food_id", "quantity"))
+
+    def invalidate(self):
+        self.__dict__.pop("_summary", None)
+        self.__dict__.pop("cart_quantities", None)
+
+
+def get_shopper(request):
+    shopper = getattr(request, "shopper", None)
+    if shopper is None:
+        shopper = request.shopper = ShopperState(request.user)
+    return shopper
@@ -0,0 +1,177 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from menu.models import FoodItem
+from wallet.models import WalletTopUp
+from . import events, rollups, search
+from .models import Cart, Order, OrderEvent, OrderItem
+from .transitions import order_transitioned
+
+
+@receiver(post_save, sender=FoodItem)
+def refresh_cart_subtotals(sender, instance, created, update_fields=None, **kwargs):
+    # Cart.subtotal is priced at the current food price
+    if created or (update_fields is not None and "price" not in update_fields):
+        return
+    Cart.objects.filter(items__food=instance).recalculate_totals()
+
+
+# =========================
+# SALES ROLLUPS
+# =========================
+@receiver(pre_save, sender=Order)
+def remember_order_state(sender, instance, **kwargs):
+    instance._rollup_old = instance._rider_old = None
+    if instance.pk:
+        row = (
+            Order.objects.filter(pk=instance.pk)
+            .values_list("status", "total_amount", "is_paid", "delivery_person_id")
+            .first()
+        )
+        if row:
+            instance._rollup_old = row[:3]
+            # (rider, status) for delivery.signals
+            instance._rider_old = (row[3], row[0])
+
+
+@receiver(post_save, sender=Order)
+def roll_up_order(sender, instance, created, **kwargs):
+    day = rollups.order_day(instance)
+    new = (instance.status, instance.total_amount, instance.is_paid)
+    old = getattr(instance, "_rollup_old", None)
+
+    if old == new:
+        return
+    if old is not None:
+        rollups.add_order(day, *old, sign=-1)
+    rollups.add_order(day, *new)
+
+
+@receiver(order_transitioned)
+def roll_up_transition(sender, order, previous, **kwargs):
+    # transitions use a conditional UPDATE, which fires no post_save
+    if previous == order.status:
+        return
+    day = rollups.order_day(order)
+    rollups.add_order(day, previous, order.total_amount, order.is_paid, sign=-1)
+    rollups.add_order(day, order.status, order.total_amount, order.is_paid)
+
+
+@receiver(post_delete, sender=Order)
+def unroll_order(sender, instance, **kwargs):
+    rollups.add_order(rollups.order_day(instance), instance.status, instance.total_amount, instance.is_paid, sign=-1)
+
+
+def _item_day(item):
+    created_at = Order.objects.filter(pk=item.order_id).values_list("created_at", flat=True).first()
+    return timezone.localdate(created_at) if created_at else None
+
+
+@receiver(pre_save, sender=OrderItem)
+def remember_item_state(sender, instance, **kwargs):
+    instance._rollup_old = None
+    if instance.pk:
+        instance._rollup_old = (
+            OrderItem.objects.filter(pk=instance.pk)
+            .values_list("food_id", "quantity", "price_at_purchase")
+            .first()
+        )
+
+
+@receiver(post_save, sender=OrderItem)
+def roll_up_item(sender, instance, created, **kwargs):
+    new = (instance.food_id, instance.quantity, instance.price_at_purchase)
+    old = getattr(instance, "_rollup_old", None)
+    if old == new:
+        return
+
+    day = _item_day(instance)
+    if day is None:
+        return
+    if old is not None:
+        rollups.add_item(day, *old, sign=-1)
+    rollups.add_item(day, *new)
+
+
+@receiver(post_delete, sender=OrderItem)
+def unroll_item(sender, instance, **kwargs):
+    day = _item_day(instance)
+    if day is not None:
+        rollups.add_item(day, instance.food_id, instance.quantity, instance.price_at_purchase, sign=-1)
+
+
+# =========================
+# SEARCH INDEX
+# =========================
+def _touches(update_fields, fields):
+    return update_fields is None or bool(set(update_fields) & fields)
+
+
+@receiver(post_save, sender=Order)
+def index_order(sender, instance, created, update_fields=None, **kwargs):
+    if created or _touches(update_fields, {"user", "phone"}):
+        search.index_orders([instance])
+
+
+@receiver(post_delete, sender=Order)
+def unindex_order(sender, instance, **kwargs):
+    search.unindex("order", instance.pk)
+
+
+@receiver(post_save, sender=WalletTopUp)
+def index_topup(sender, instance, created, update_fields=None, **kwargs):
+    if created or _touches(update_fields, {"user", "reference"}):
+        search.index_topups([instance])
+
+
+@receiver(post_delete, sender=WalletTopUp)
+def unindex_topup(sender, instance, **kwargs):
+    search.unindex("topup", instance.pk)
+
+
+@receiver(post_save, sender=User)
+def reindex_user(sender, instance, created, update_fields=None, **kwargs):
+    if not created and _touches(update_fields, {"username", "email"}):
+        search.reindex_user(instance)
+
+
+# =========================
+# LIVE EVENTS
+# =========================
+def _announce(order, previous, created=False):
+    event = events.status_event(order.pk, order.status, previous)
+    events.publish_on_commit(events.order_channel(order.pk), event)
+
+    staff_event = {**event, "kind": "created" if created else "status", "total_amount": str(order.total_amount)}
+    if created:
+        staff_event["customer"] = order.user.get_username()
+    events.publish_on_commit(events.STAFF_CHANNEL, staff_event)
+
+
+@receiver(post_save, sender=Order)
+def announce_status(sender, instance, created, **kwargs):
+    # old values come from remember_order_state above
+    old = getattr(instance, "_rollup_old", None)
+    previous = old[0] if old else None
+    if previous != instance.status:
+        _announce(instance, previous, created)
+
+
+@receiver(order_transitioned)
+def announce_transition(sender, order, previous, **kwargs):
+    if previous != order.status:
+        _announce(order, previous)
+
+
+# =========================
+# EVENT LOG
+# =========================
+@receiver(post_save, sender=Order)
+def log_status_change(sender, instance, created, **kwargs):
+    # orders.transitions logs its own moves; this catches creation and plain saves (admin...)
+    old = getattr(instance, "_rollup_old", None)
+    previous = old[0] if old else ""
+    if created or previous != instance.status:
+        OrderEvent.objects.create(order=instance, from_status=previous, to_status=instance.status)
@@ -0,0 +1,88 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from menu.models import FoodItem
+from wallet.models import WalletTopUp
+from .models import DailyFoodRollup, DailySalesRollup, OrderEvent
+
+STATS_CACHE_KEY = "control:dashboard:stats"
+STATS_TTL = getattr(settings, "CONTROL_STATS_TTL", 30)
+
+ZERO = Decimal("0.00")
+
+
+def order_stats():
+    """Order KPIs from the daily rollups: O(days), not O(orders)."""
+    today = timezone.localdate()
+    last_7 = today - timedelta(days=7)
+
+    def orders(**f):
+        return Coalesce(Sum("orders", filter=Q(**f)), 0)
+
+    return DailySalesRollup.objects.aggregate(
+        total_orders=Coalesce(Sum("orders"), 0),
+        pending_orders=orders(status="pending"),
+        preparing_orders=orders(status="preparing"),
+        assigned_orders=orders(status="assigned"),
+        on_the_way_orders=orders(status="on_the_way"),
+        delivered_today=orders(status="delivered", day=today),
+        delivered_orders=orders(status="delivered"),
+        cancelled_orders=orders(status="cancelled"),
+        paid_orders=Coalesce(Sum("paid_orders"), 0),
+        today_revenue=Coalesce(Sum("paid_amount", filter=Q(day=today)), ZERO),
+        last7_revenue=Coalesce(Sum("paid_amount", filter=Q(day__gt=last_7)), ZERO),
+    )
+
+
+def food_stats():
+    return FoodItem.objects.aggregate(
+        total_food=Count("id"),
+        available_food=Count("id", filter=Q(available=True)),
+    )
+
+
+def topup_stats():
+    return WalletTopUp.objects.aggregate(
+        pending_topups=Count("id", filter=Q(status="pending")),
+    )
+
+
+def top_foods(limit=5):
+    return list(
+        DailyFoodRollup.objects.values("food__name")
+        .annotate(qty=Coalesce(Sum("quantity"), 0))
+        .filter(qty__gt=0)
+        .order_by("-qty")[:limit]
+    )
+
+
+def delivery_sla(days=7):
+    """Average minutes from placing to delivery over the last `days`, from the event log."""
+    placed = OrderEvent.objects.filter(order=OuterRef("order"), from_status="").values("created_at")[:1]
+    took = (
+        OrderEvent.objects.filter(to_status="delivered", created_at__gte=timezone.now() - timedelta(days=days))
+        .annotate(took=F("created_at") - Subquery(placed))
+        .aggregate(avg=Avg("took"))["avg"]
+    )
+    return {"avg_delivery_minutes": round(took.total_seconds() / 60) if took else None}
+
+
+def compute_dashboard_stats():
+    stats = {}
+    stats.update(order_stats())
+    stats.update(food_stats())
+    stats.update(topup_stats())
+    stats.update(delivery_sla())
+    stats["top_foods"] = top_foods()
+    return stats
+
+
+def dashboard_stats():
+    """KPIs for control:dashboard, cached for STATS_TTL seconds."""
+    return cache.get_or_set(STATS_CACHE_KEY, compute_dashboard_stats, STATS_TTL)
@@ -1,3 +1,633 @@
-from django.test import TestCase
+import csv
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from menu.models import Category, FoodItem
+from wallet.models import Wallet, WalletTransaction
+from . import events, exports, jobs, rollups, search
+from .cart import decrement_item, increment_item
+from .checkout import place_order
+from .models import Cart, CartItem, DailyFoodRollup, DailySalesRollup, Job, Order, OrderItem, SearchToken
+from .pagination import CursorPaginator
+
+
+class CartMutationTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user("ada", password="pass12345")
+        category = Category.objects.create(name="Rice")
+        self.food = FoodItem.objects.create(category=category, name="Jollof", price=Decimal("1500.00"))
+        self.cart = Cart.objects.create(user=user)
+
+    def test_increment_then_decrement_keeps_counters(self):
+        self.assertEqual(increment_item(self.cart, self.food), 1)
+        self.assertEqual(increment_item(self.cart, self.food), 2)
+        self.assertEqual(decrement_item(self.cart, self.food), 1)
+        self.assertEqual(decrement_item(self.cart, self.food), 0)
+        self.assertEqual(decrement_item(self.cart, self.food), 0)
+
+        self.cart.refresh_from_db()
+        self.assertFalse(CartItem.objects.filter(cart=self.cart).exists())
+        self.assertEqual(self.cart.item_count, 0)
+        self.assertEqual(self.cart.subtotal, 0)
+
+
+class ConcurrentCartIncrementTests(TransactionTestCase):
+    TAPS = 200
+
+    def setUp(self):
+        user = User.objects.create_user("ada", password="pass12345")
+        category = Category.objects.create(name="Rice")
+        self.food = FoodItem.objects.create(category=category, name="Jollof", price=Decimal("1500.00"))
+        self.cart = Cart.objects.create(user=user)
+
+    def _tap(self, _):
+        try:
+            increment_item(self.cart, self.food)
+        finally:
+            connection.close()
+
+    def test_parallel_increments_are_not_lost(self):
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(pool.map(self._tap, range(self.TAPS)))
+
+        item = CartItem.objects.get(cart=self.cart, food=self.food)
+        self.cart.refresh_from_db()
+        self.assertEqual(item.quantity, self.TAPS)
+        self.assertEqual(self.cart.item_count, self.TAPS)
+        self.assertEqual(self.cart.subtotal, self.food.price * self.TAPS)
+
+
+class PlaceOrderTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("ada", password="pass12345")
+        category = Category.objects.create(name="Rice")
+        self.jollof = FoodItem.objects.create(category=category, name="Jollof", price=Decimal("1500.00"))
+        self.plantain = FoodItem.objects.create(category=category, name="Plantain", price=Decimal("500.00"))
+        self.cart = Cart.objects.create(user=self.user)
+        increment_item(self.cart, self.jollof)
+        increment_item(self.cart, self.jollof)
+        increment_item(self.cart, self.plantain)
+
+    def _place(self, payment_method):
+        return place_order(
+            self.user, self.cart, address="12 Allen Avenue", phone="0800", payment_method=payment_method,
+        )
+
+    def test_cod_order_takes_every_line_and_clears_cart(self):
+        order = self._place("cod")
+
+        self.assertEqual((order.payment_method, order.is_paid), ("cod", False))
+        self.assertEqual(order.total_amount, Decimal("3500.00"))
+        self.assertEqual(
+            sorted(order.items.values_list("food__name", "quantity", "price_at_purchase")),
+            [("Jollof", 2, Decimal("1500.00")), ("Plantain", 1, Decimal("500.00"))],
+        )
+        self.cart.refresh_from_db()
+        self.assertFalse(CartItem.objects.filter(cart=self.cart).exists())
+        self.assertEqual((self.cart.item_count, self.cart.subtotal), (0, 0))
+
+    def test_unknown_method_falls_back_to_cod(self):
+        self.assertEqual(self._place("bitcoin").payment_method, "cod")
+
+    def test_wallet_order_is_paid_and_debited(self):
+        wallet = Wallet.objects.create(user=self.user, balance=Decimal("5000.00"))
+
+        order = self._place("wallet")
+
+        self.assertEqual((order.payment_method, order.is_paid), ("wallet", True))
+        wallet.refresh_from_db()
+        self.assertEqual(wallet.balance, Decimal("1500.00"))
+        self.assertTrue(WalletTransaction.objects.filter(order=order, tx_type="debit", amount=order.total_amount).exists())
+
+    def test_insufficient_wallet_rolls_everything_back(self):
+        Wallet.objects.create(user=self.user, balance=Decimal("1000.00"))
+
+        with self.assertRaisesMessage(ValueError, "Insufficient wallet balance"):
+            self._place("wallet")
+
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(OrderItem.objects.exists())
+        self.assertEqual(Wallet.objects.get(user=self.user).balance, Decimal("1000.00"))
+        self.cart.refresh_from_db()
+        self.assertEqual(CartItem.objects.filter(cart=self.cart).count(), 2)
+        self.assertEqual((self.cart.item_count, self.cart.subtotal), (3, Decimal("3500.00")))
+
+    def test_empty_cart_is_refused(self):
+        CartItem.objects.filter(cart=self.cart).delete()
+        with self.assertRaisesMessage(ValueError, "Your cart is empty."):
+            self._place("cod")
+
+
+class CheckoutReplayTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("ada", password="pass12345")
+        category = Category.objects.create(name="Rice")
+        food = FoodItem.objects.create(category=category, name="Jollof", price=Decimal("1500.00"))
+        increment_item(Cart.objects.create(user=self.user), food)
+        self.client.force_login(self.user)
+        self.form = {
+            "delivery_address": "12 Allen Avenue", "phone": "0800",
+            "payment_method": "cod", "idempotency_key": "a" * 32,
+        }
+
+    def test_resubmitted_form_replays_the_order(self):
+        first = self.client.post(reverse("orders:checkout"), self.form)
+        order = Order.objects.get()
+        detail = reverse("orders:order_detail", args=[order.id])
+        self.assertRedirects(first, detail, fetch_redirect_response=False)
+
+        second = self.client.post(reverse("orders:checkout"), self.form)
+        self.assertRedirects(second, detail, fetch_redirect_response=False)
+        self.assertEqual(Order.objects.count(), 1)
+
+
+class ConcurrentCheckoutTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("ada", password="pass12345")
+        category = Category.objects.create(name="Rice")
+        food = FoodItem.objects.create(category=category, name="Jollof", price=Decimal("1500.00"))
+        increment_item(Cart.objects.create(user=self.user), food)
+        self.form = {
+            "delivery_address": "12 Allen Avenue", "phone": "0800",
+            "payment_method": "cod", "idempotency_key": "b" * 32,
+        }
+
+    def _submit(self, _):
+        client = Client()
+        client.force_login(self.user)
+        try:
+            return client.post(reverse("orders:checkout"), self.form)
+        finally:
+            connection.close()
+
+    def test_double_tap_places_one_order_and_both_see_it(self):
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            responses = list(pool.map(self._submit, range(2)))
+
+        order = Order.objects.get()
+        detail = reverse("orders:order_detail", args=[order.id])
+        self.assertEqual([r.status_code for r in responses], [302, 302])
+        self.assertEqual([r["Location"] for r in responses], [detail, detail])
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("ada", password="pass12345")
+        self.category = Category.objects.create(name="Rice")
+        self.food = FoodItem.objects.create(category=self.category, name="Jollof", price=Decimal("1500.00"))
+
+    def _sales(self):
+        return {r.status: (r.orders, r.amount, r.paid_orders, r.paid_amount) for r in DailySalesRollup.objects.all()}
+
+    def _foods(self):
+        return {r.food_id: (r.quantity, r.amount) for r in DailyFoodRollup.objects.all()}
+
+    def _checkout(self, foods):
+        cart = Cart.objects.create(user=self.user)
+        for food in foods:
+            increment_item(cart, food)
+        return place_order(self.user, cart, address="12 Allen Avenue", phone="0800")
+
+    def test_order_create_paid_toggle_status_change_and_delete(self):
+        order = Order.objects.create(
+            user=self.user, delivery_address="12 Allen Avenue", phone="0800", total_amount=Decimal("1500.00"),
+        )
+        self.assertEqual(self._sales(), {"pending": (1, 1500, 0, 0)})
+
+        order.is_paid = True
+        order.save()
+        self.assertEqual(self._sales(), {"pending": (1, 1500, 1, 1500)})
+
+        order.transition("preparing")
+        self.assertEqual(self._sales(), {"pending": (0, 0, 0, 0), "preparing": (1, 1500, 1, 1500)})
+
+        OrderItem.objects.create(order=order, food=self.food, quantity=1, price_at_purchase=Decimal("1500.00"))
+        self.assertEqual(self._foods(), {self.food.pk: (1, 1500)})
+
+        order.delete()
+        self.assertEqual(self._sales()["preparing"], (0, 0, 0, 0))
+        self.assertEqual(self._foods(), {self.food.pk: (0, 0)})
+
+    def test_checkout_rolls_up_lines_in_constant_queries(self):
+        self._checkout([self.food])  # the day's sales row now exists
+        foods = [
+            FoodItem.objects.create(category=self.category, name=f"Dish {i}", price=Decimal("100.00"))
+            for i in range(21)
+        ]
+
+        counts = []
+        for batch in (foods[:1], foods[1:]):
+            cart = Cart.objects.create(user=self.user)
+            for food in batch:
+                increment_item(cart, food)
+            with CaptureQueriesContext(connection) as ctx:
+                place_order(self.user, cart, address="12 Allen Avenue", phone="0800")
+            counts.append(len(ctx))
+        self.assertEqual(counts[0], counts[1])
+
+        self._checkout([self.food, self.food, foods[0]])  # existing rows are added to
+        rollup = self._foods()
+        self.assertEqual(rollup[self.food.pk], (3, 4500))
+        self.assertEqual(rollup[foods[0].pk], (2, 200))
+        self.assertEqual(rollup[foods[20].pk], (1, 100))
+
+    def test_rebuild_matches_incremental(self):
+        self._checkout([self.food, self.food])
+        incremental = (self._sales(), self._foods())
+        rollups.rebuild()
+        self.assertEqual((self._sales(), self._foods()), incremental)
+
+
+class DashboardQueryCountTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user("boss", password="pass12345", is_staff=True)
+        self.customer = User.objects.create_user("ada", password="pass12345")
+        category = Category.objects.create(name="Rice")
+        self.food = FoodItem.objects.create(category=category, name="Jollof", price=Decimal("1500.00"))
+        self.client.force_login(self.staff)
+
+    def _add_orders(self, n):
+        for i in range(n):
+            order = Order.objects.create(
+                user=self.customer,
+                delivery_address="12 Allen Avenue",
+                phone="08000000000",
+                total_amount=Decimal("1500.00"),
+                status=["pending", "preparing", "delivered", "cancelled"][i % 4],
+                is_paid=bool(i % 2),
+            )
+            OrderItem.objects.create(order=order, food=self.food, quantity=1, price_at_purchase=self.food.price)
+
+    def _dashboard_queries(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("control:dashboard"))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx)
+
+    def test_query_count_does_not_grow_with_orders(self):
+        self._add_orders(2)
+        few = self._dashboard_queries()
+
+        self._add_orders(60)
+        many = self._dashboard_queries()
+
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, 10)
+
+    def test_cached_stats_skip_aggregates(self):
+        self._add_orders(4)
+        cold = self._dashboard_queries()
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("control:dashboard"))
+        self.assertLess(len(ctx), cold)
+
+
+JOB_CALLS = []
+
+
+def record_call(value):
+    JOB_CALLS.append(value)
+
+
+def always_fail():
+    raise RuntimeError("boom")
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        JOB_CALLS.clear()
+
+    def test_claims_due_jobs_by_priority_once(self):
+        low = jobs.enqueue(record_call, value="low")
+        high = jobs.enqueue(record_call, priority=5, value="high")
+        jobs.enqueue(record_call, delay=timedelta(hours=1), value="later")
+
+        self.assertEqual(jobs.claim("w1", limit=1), [high.id])
+        self.assertEqual(jobs.claim("w2", limit=5), [low.id])
+        self.assertEqual(jobs.claim("w3", limit=5), [])
+
+    def test_run_marks_done(self):
+        job = jobs.enqueue("orders.tests.record_call", value=42)
+        jobs.claim("w1")
+
+        self.assertEqual(jobs.run(job.id), "done")
+        self.assertEqual(JOB_CALLS, [42])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("done", 1))
+
+    def test_failures_retry_with_backoff_then_fail(self):
+        job = jobs.enqueue(always_fail, max_attempts=2)
+
+        jobs.claim("w1")
+        self.assertEqual(jobs.run(job.id), "queued")
+        job.refresh_from_db()
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn("boom", job.last_error)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        jobs.claim("w1")
+        self.assertEqual(jobs.run(job.id), "failed")
+
+    def test_stale_running_jobs_are_requeued(self):
+        job = jobs.enqueue(record_call, value=1)
+        jobs.claim("dead-worker")
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(jobs.requeue_stale(), 1)
+        self.assertEqual(jobs.claim("w1"), [job.id])
+
+
+class CursorPaginatorTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user("ada", password="pass12345")
+        for _ in range(7):
+            Order.objects.create(user=user, delivery_address="12 Allen Avenue", phone="0800")
+        # five share a timestamp across page boundaries, so id has to break the tie
+        tied = list(Order.objects.order_by("pk").values_list("pk", flat=True)[1:6])
+        Order.objects.filter(pk__in=tied).update(created_at=timezone.now() - timedelta(hours=1))
+        self.expected = list(Order.objects.order_by("-created_at", "-id").values_list("pk", flat=True))
+        self.paginator = CursorPaginator(Order.objects.all(), 3)
+
+    def _ids(self, page):
+        return [o.pk for o in page]
+
+    def test_walking_forward_visits_every_row_once(self):
+        seen, page = [], self.paginator.get_page()
+        while True:
+            seen += self._ids(page)
+            if not page.has_next:
+                break
+            page = self.paginator.get_page(after=page.next_cursor)
+        self.assertEqual(seen, self.expected)
+
+    def test_after_then_before_round_trips(self):
+        first = self.paginator.get_page()
+        second = self.paginator.get_page(after=first.next_cursor)
+        third = self.paginator.get_page(after=second.next_cursor)
+
+        self.assertEqual(self._ids(self.paginator.get_page(before=third.previous_cursor)), self._ids(second))
+        self.assertEqual(self._ids(self.paginator.get_page(before=second.previous_cursor)), self._ids(first))
+        self.assertFalse(self.paginator.get_page(before=second.previous_cursor).has_previous)
+
+    def test_malformed_cursor_falls_back_to_first_page(self):
+        first = self._ids(self.paginator.get_page())
+        for cursor in ["not-a-cursor", "W10", "WyJ4IiwgInkiXQ"]:  # garbage, [], ["x", "y"]
+            self.assertEqual(self._ids(self.paginator.get_page(after=cursor)), first)
+            self.assertEqual(self._ids(self.paginator.get_page(before=cursor)), first)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        ada = User.objects.create_user("ada", email="ada@example.com", password="pass12345")
+        adaeze = User.objects.create_user("adaeze", password="pass12345")
+        self.staff = User.objects.create_user("boss", password="pass12345", is_staff=True)
+
+        def order(user, status="pending", phone="0800"):
+            return Order.objects.create(user=user, delivery_address="12 Allen Avenue", phone=phone, status=status)
+
+        self.ada_old = order(ada, phone="0803 123 4567")
+        self.adaeze = order(adaeze)
+        self.ada_cancelled = order(ada, status="cancelled")
+
+    def test_hash_id_comes_first(self):
+        for q in (f"#{self.adaeze.pk}", str(self.adaeze.pk)):
+            self.assertEqual(search.ranked_ids("order", q)[0], self.adaeze.pk)
+
+    def test_exact_word_outranks_prefix(self):
+        self.assertEqual(
+            search.ranked_ids("order", "ada"),
+            [self.ada_cancelled.pk, self.ada_old.pk, self.adaeze.pk],
+        )
+        self.assertEqual(search.ranked_ids("order", "ada 08031234567"), [self.ada_old.pk])
+
+    def test_status_filter_applies_to_search_results(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("control:orders_list"), {"status": "pending", "q": "ada"})
+        self.assertEqual([o.pk for o in response.context["page_obj"]], [self.ada_old.pk, self.adaeze.pk])
+
+    def test_rebuild_restores_the_index(self):
+        before = search.ranked_ids("order", "ada")
+        SearchToken.objects.all().delete()
+        self.assertEqual(search.rebuild(), (3, 0))
+        self.assertEqual(search.ranked_ids("order", "ada"), before)
+
+
+class LiveStatusTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("ada", password="pass12345")
+        self.order = Order.objects.create(user=self.user, delivery_address="12 Allen Avenue", phone="0800")
+        self.client.force_login(self.user)
+
+    def test_other_users_order_is_404(self):
+        other = Order.objects.create(
+            user=User.objects.create_user("bola", password="pass12345"), delivery_address="1 Marina", phone="0801",
+        )
+        self.assertEqual(self.client.get(reverse("orders:order_events", args=[other.pk])).status_code, 404)
+        self.assertEqual(self.client.get(reverse("orders:order_status", args=[other.pk])).status_code, 404)
+
+    def test_page_polls_when_streaming_is_off(self):
+        page = self.client.get(reverse("orders:order_detail", args=[self.order.pk]))
+        self.assertContains(page, reverse("orders:order_status", args=[self.order.pk]))
+        self.assertNotContains(page, reverse("orders:order_events", args=[self.order.pk]))
+
+    def test_polling_reads_current_status(self):
+        self.order.transition("preparing")
+        data = self.client.get(reverse("orders:order_status", args=[self.order.pk])).json()
+        self.assertEqual((data["order_id"], data["status"], data["status_display"]), (self.order.pk, "preparing", "Preparing"))
+
+    def test_stream_is_refused_under_wsgi_setting(self):
+        response = self.client.get(reverse("orders:order_events", args=[self.order.pk]))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(response.streaming)
+
+
+@override_settings(ORDER_EVENTS_STREAMING=True)
+class LiveStatusStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("ada", password="pass12345")
+        self.order = Order.objects.create(user=self.user, delivery_address="12 Allen Avenue", phone="0800")
+
+    async def test_first_event_is_current_status(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("orders:order_events", args=[self.order.pk]))
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b"retry: 5000\n\n")
+        event, data = (await anext(stream)).decode().strip().split("\n")
+        await stream.aclose()
+
+        self.assertEqual(event, "event: status")
+        self.assertEqual(json.loads(data.removeprefix("data: "))["status"], "pending")
+
+
+class BoardTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user("boss", password="pass12345", is_staff=True)
+        self.customer = User.objects.create_user("ada", password="pass12345")
+        self.order = Order.objects.create(user=self.customer, delivery_address="12 Allen Avenue", phone="0800")
+
+    def test_staff_only(self):
+        self.client.force_login(self.customer)
+        for name in ("board", "board_events", "board_poll"):
+            self.assertEqual(self.client.get(reverse(f"control:{name}")).status_code, 302, name)
+
+    def test_board_polls_when_streaming_is_off(self):
+        self.client.force_login(self.staff)
+        page = self.client.get(reverse("control:board"))
+        self.assertContains(page, reverse("control:board_poll"))
+        self.assertNotContains(page, reverse("control:board_events"))
+        self.assertEqual(self.client.get(reverse("control:board_events")).status_code, 204)
+
+    def test_poll_sends_coalesced_orders_after_cursor(self):
+        self.client.force_login(self.staff)
+        start = self.client.get(reverse("control:board_poll")).json()
+        self.assertEqual((start["orders"], start["created"], start["pending"]), ([], 0, 1))
+
+        self.order.transition("preparing")
+        self.order.transition("cancelled")
+        new = Order.objects.create(user=self.customer, delivery_address="12 Allen Avenue", phone="0800")
+
+        data = self.client.get(reverse("control:board_poll"), {"after": start["last"]}).json()
+        by_order = {e["order_id"]: e for e in data["orders"]}
+        self.assertEqual(set(by_order), {self.order.pk, new.pk})
+        self.assertEqual((by_order[self.order.pk]["kind"], by_order[self.order.pk]["status"]), ("status", "cancelled"))
+        self.assertEqual((by_order[new.pk]["kind"], by_order[new.pk]["customer"]), ("created", "ada"))
+        self.assertEqual((data["created"], data["pending"]), (1, 1))
+
+        again = self.client.get(reverse("control:board_poll"), {"after": data["last"]}).json()
+        self.assertEqual(again["orders"], [])
+
+
+@override_settings(ORDER_EVENTS_STREAMING=True)
+class BoardStreamTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user("boss", password="pass12345", is_staff=True)
+
+    async def test_burst_goes_out_as_one_orders_message(self):
+        await self.async_client.aforce_login(self.staff)
+        response = await self.async_client.get(reverse("control:board_events"))
+        stream = aiter(response.streaming_content)
+        await anext(stream)  # retry
+        self.assertIn(b'"orders":[]', await anext(stream))
+
+        status = {"status": "preparing", "previous": "pending", "at": "", "kind": "status"}
+        events.publish(events.STAFF_CHANNEL, {"order_id": 1, "status": "pending", "kind": "created", "at": ""})
+        events.publish(events.STAFF_CHANNEL, {**status, "order_id": 1})
+        events.publish(events.STAFF_CHANNEL, {**status, "order_id": 2})
+        message = (await anext(stream)).decode()
+        await stream.aclose()
+
+        self.assertTrue(message.startswith("event: orders\n"))
+        data = json.loads(message.split("data: ", 1)[1])
+        self.assertEqual(
+            sorted((e["order_id"], e["kind"], e["status"]) for e in data["orders"]),
+            [(1, "created", "preparing"), (2, "status", "preparing")],
+        )
+        self.assertEqual(data["created"], 1)
+
+
+class OrderTransitionTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user("staff", password="pass12345", is_staff=True)
+        self.rider = User.objects.create_user("rider", password="pass12345")
+        self.order = Order.objects.create(
+            user=self.staff, delivery_address="12 Allen Avenue", phone="0800",
+            total_amount=Decimal("1500.00"), is_paid=True,
+        )
+
+    def _rollup(self, status):
+        row = DailySalesRollup.objects.filter(status=status).first()
+        return (row.orders, row.paid_amount) if row else (0, 0)
+
+    def test_transition_logs_event_and_moves_rollups(self):
+        self.order.transition("preparing", actor=self.staff)
+        self.order.transition("assigned", actor=self.staff, delivery_person=self.rider)
+
+        self.order.refresh_from_db()
+        self.assertEqual((self.order.status, self.order.delivery_person), ("assigned", self.rider))
+        self.assertEqual(
+            list(self.order.events.values_list("from_status", "to_status", "actor")),
+            [("", "pending", None), ("pending", "preparing", self.staff.id), ("preparing", "assigned", self.staff.id)],
+        )
+        self.assertEqual(self._rollup("pending"), (0, 0))
+        self.assertEqual(self._rollup("assigned"), (1, Decimal("1500.00")))
+
+    def test_illegal_and_stale_transitions_are_refused(self):
+        with self.assertRaises(ValueError):
+            self.order.transition("delivered")
+        with self.assertRaises(ValueError):
+            self.order.transition("assigned")  # no rider
+
+        stale = Order.objects.get(pk=self.order.pk)
+        self.order.transition("cancelled")
+        with self.assertRaises(ValueError):
+            stale.transition("preparing")
+
+        self.assertEqual(Order.objects.get(pk=self.order.pk).status, "cancelled")
+        self.assertEqual(self.order.events.count(), 2)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user("staff", password="pass12345", is_staff=True)
+        food = FoodItem.objects.create(
+            category=Category.objects.create(name="Mains"), name="Jollof", price=Decimal("1200.00"),
+        )
+        self.orders = []
+        for status in ["pending", "cancelled", "pending"]:
+            order = Order.objects.create(
+                user=self.staff, delivery_address="12 Allen Avenue", phone="0800",
+                total_amount=Decimal("2400.00"), status=status,
+            )
+            OrderItem.objects.create(order=order, food=food, quantity=2, price_at_purchase=Decimal("1200.00"))
+            self.orders.append(order)
+        Order.objects.filter(pk=self.orders[2].pk).update(created_at=timezone.now() - timedelta(days=10))
+        self.client.force_login(self.staff)
+
+    def _lines(self, name, **params):
+        response = self.client.get(reverse(f"control:{name}"), params)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode().splitlines()
+
+    def test_orders_csv_filters_by_status_and_day(self):
+        lines = self._lines("export_orders", status="pending", **{"from": str(timezone.localdate())})
+        self.assertEqual(lines[0].split(",")[:3], ["id", "created_at", "status"])
+        self.assertEqual([line.split(",")[0] for line in lines[1:]], [str(self.orders[0].pk)])
+
+    def test_items_jsonl(self):
+        rows = [json.loads(line) for line in self._lines("export_order_items", format="jsonl")]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual((rows[0]["food_name"], Decimal(rows[0]["line_total"])), ("Jollof", Decimal("2400")))
+
+    def test_formula_cells_are_escaped(self):
+        Order.objects.filter(pk=self.orders[0].pk).update(delivery_address='=HYPERLINK("http://x.test","hi")')
+        rows = {r["id"]: r for r in csv.DictReader(self._lines("export_orders", status="pending"))}
+        self.assertEqual(rows[str(self.orders[0].pk)]["delivery_address"], '\'=HYPERLINK("http://x.test","hi")')
+        self.assertEqual(rows[str(self.orders[2].pk)]["delivery_address"], "12 Allen Avenue")
+        self.assertEqual(exports.csv_cell(Decimal("-5.00")), Decimal("-5.00"))  # numbers stay numbers
+        self.assertEqual([exports.csv_cell(v) for v in ["+234", "@sum", "-1"]], ["'+234", "'@sum", "'-1"])
+
+    async def test_asgi_gets_an_async_iterator(self):
+        await self.async_client.aforce_login(self.staff)
+        response = await self.async_client.get(reverse("control:export_orders"))
+        self.assertTrue(response.is_async)  # Django would list() a sync one under ASGI
+        body = b"".join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertEqual(len(body.splitlines()), 4)
+
+    def test_staff_only(self):
+        self.client.force_login(User.objects.create_user("shopper", password="pass12345"))
+        response = self.client.get(reverse("control:export_wallet_transactions"))
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,75 @@
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Order, OrderEvent
+
+# status -> statuses it may move to
+TRANSITIONS = {
+    "pending": {"preparing", "assigned", "cancelled"},
+    "preparing": {"pending", "assigned", "cancelled"},
+    "assigned": {"assigned", "preparing", "picked_up", "delivered", "cancelled"},  # assigned -> assigned: new rider
+    "picked_up": {"on_the_way", "delivered", "cancelled"},
+    "on_the_way": {"delivered", "cancelled"},
+    "delivered": set(),
+    "cancelled": set(),
+}
+
+# statuses that need order.delivery_person
+RIDER_STATUSES = {"assigned", "picked_up", "on_the_way"}
+
+# Sent inside the transaction after a transition is written, with
+# order (already updated in memory), previous, previous_rider and actor.
+# Order.objects.update() fires no post_save, so rollups, live events and
+# rider loads listen to this as well (orders.signals, delivery.signals).
+order_transitioned = Signal()
+
+
+def allowed(status):
+    return sorted(TRANSITIONS.get(status, ()))
+
+
+def _label(status):
+    return dict(Order.STATUS_CHOICES).get(status, status).lower()
+
+
+def transition(order, to, *, actor=None, **fields):
+    """
+    Move `order` to status `to`, setting `fields` in the same UPDATE, and
+    append an OrderEvent. The UPDATE only matches a row still in the state
+    we read, so of two racing transitions exactly one wins. Raises
+    ValueError for an illegal move or when the order changed meanwhile.
+    """
+    previous = order.status
+    if to not in TRANSITIONS.get(previous, ()):
+        raise ValueError(f"Cannot change order #{order.pk} from {_label(previous)} to {_label(to)}.")
+
+    previous_rider = order.delivery_person_id
+    rider = fields.get("delivery_person", fields.get("delivery_person_id", previous_rider))
+    if to in RIDER_STATUSES and not rider:
+        raise ValueError(f"Assign a rider to order #{order.pk} first.")
+
+    with transaction.atomic():
+        matched = Order.objects.filter(
+            pk=order.pk,
+            status=previous,
+            # rollups and rider loads are adjusted from these, so they must not be stale either
+            delivery_person_id=previous_rider,
+            is_paid=order.is_paid,
+            total_amount=order.total_amount,
+        ).update(status=to, **fields)
+        if not matched:
+            raise ValueError(f"Order #{order.pk} was changed by someone else. Reload and try again.")
+
+        order.status = to
+        for name, value in fields.items():
+            setattr(order, name, value)
+        OrderEvent.objects.create(
+            order_id=order.pk, from_status=previous, to_status=to,
+            actor=actor if actor is not None and actor.is_authenticated else None,
+            created_at=timezone.now(),
+        )
+        order_transitioned.send(
+            sender=Order, order=order, previous=previous, previous_rider=previous_rider, actor=actor,
+        )
+    return order
@@ -11,5 +11,7 @@ urlpatterns = [
     path("checkout/", views.checkout, name="checkout"),
     path("orders/", views.order_list, name="order_list"),
     path("orders/<int:order_id>/", views.order_detail, name="order_detail"),
+    path("orders/<int:order_id>/events/", views.order_events, name="order_events"),
+    path("orders/<int:order_id>/status/", views.order_status, name="order_status"),
     path('cart/update-ajax/', views.update_cart_ajax, name='update_cart_ajax'),
 ]
@@ -1,13 +1,20 @@
 from decimal import Decimal
 from django.contrib.auth.decorators import login_required
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
 from menu.models import FoodItem
-from .models import Cart, CartItem, Order, OrderItem
+from .models import Cart, CartItem, Order, OrderEvent
 from django.contrib import messages
-from wallet.models import Wallet, WalletTransaction
+from .checkout import place_order, snapshot_cart, snapshot_total
+from .cart import decrement_item, increment_item, set_item_quantity
+from .pagination import CursorPaginator
+from .idempotency import issue_key, remember_result, replayed_response, update_result
+from .shopper import get_shopper
+from . import events
+import asyncio
 import json
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_POST
 
 
@@ -23,14 +30,7 @@ def add_to_cart(request, food_id):
     food = get_object_or_404(FoodItem, id=food_id, available=True)
     cart = _get_or_create_cart(request.user)
 
-    item, created = CartItem.objects.get_or_create(cart=cart, food=food)
-    if not created:
-        item.quantity += 1
-        item.save()
-    else:
-        # created = True means quantity is likely 1 already, but make it explicit
-        item.quantity = 1
-        item.save()
+    increment_item(cart, food)
 
     # Redirect back to where the user came from (best UX)
     next_url = request.GET.get("next") or request.META.get("HTTP_REFERER")
@@ -48,15 +48,14 @@ def add_to_cart(request, food_id):
 
 @login_required
 def cart_view(request):
-    cart = _get_or_create_cart(request.user)
-    items = cart.items.select_related("food").all()
+    cart = Cart.objects.filter(pk=get_shopper(request).cart_id).first()
+    items = cart.items.select_related("food") if cart else []
 
-    subtotal = sum((i.food.price * i.quantity) for i in items) if items else Decimal("0.00")
+    subtotal = cart.subtotal if cart else Decimal("0.00")
     delivery_fee = Decimal("0.00")  # keep simple for now
     total = subtotal + delivery_fee
 
     return render(request, "cart.html", {
-        "cart": cart,
         "items": items,
         "subtotal": subtotal,
         "delivery_fee": delivery_fee,
@@ -69,7 +68,7 @@ def update_cart_item(request, item_id):
         return redirect("orders:cart")
 
     cart = _get_or_create_cart(request.user)
-    item = get_object_or_404(CartItem, id=item_id, cart=cart)
+    item = get_object_or_404(CartItem.objects.select_related("food"), id=item_id, cart=cart)
 
     qty_raw = request.POST.get("quantity", "1")
     try:
@@ -77,146 +76,188 @@ def update_cart_item(request, item_id):
     except ValueError:
         qty = 1
 
-    if qty <= 0:
-        item.delete()
-    else:
-        item.quantity = qty
-        item.save()
+    set_item_quantity(item, qty)
 
     return redirect("orders:cart")
 
 @login_required
 def remove_cart_item(request, item_id):
     cart = _get_or_create_cart(request.user)
-    item = get_object_or_404(CartItem, id=item_id, cart=cart)
-    item.delete()
+    item = get_object_or_404(CartItem.objects.select_related("food"), id=item_id, cart=cart)
+    set_item_quantity(item, 0)
     return redirect("orders:cart")
 
+def _render_checkout(request, lines, **extra):
+    subtotal = snapshot_total(lines)
+    context = {
+        "items": lines,
+        "subtotal": subtotal,
+        "total": subtotal,  # + delivery fee later if you want
+        # Wallet info for template (safe even if wallet doesn't exist yet)
+        "wallet_balance": get_shopper(request).wallet_balance,
+        "selected_payment": "cod",
+        "idempotency_key": issue_key(request),
+    }
+    context.update(extra)
+    return render(request, "checkout.html", context)
+
+
 @login_required
-@transaction.atomic
 def checkout(request):
+    if request.method == "POST":
+        # Resubmitted form (slow connection, double tap): show the original order
+        replay = replayed_response(request, "checkout")
+        if replay:
+            return replay
+
     cart = _get_or_create_cart(request.user)
-    items = cart.items.select_related("food").all()
+    lines = snapshot_cart(cart)
 
-    if not items.exists():
+    if not lines:
         return redirect("menu:menu_list")
 
     profile = getattr(request.user, "profile", None)
     initial_phone = profile.phone if profile else ""
     initial_address = profile.default_address if profile else ""
 
-    subtotal = sum((i.food.price * i.quantity) for i in items)
-    total = subtotal  # + delivery fee later if you want
-
-    # Wallet info for template (safe even if wallet doesn't exist yet)
-    wallet = Wallet.objects.filter(user=request.user).first()
-    wallet_balance = wallet.balance if wallet else Decimal("0.00")
-
     if request.method == "POST":
         address = request.POST.get("delivery_address", "").strip()
         phone = request.POST.get("phone", "").strip()
         payment_method = request.POST.get("payment_method", "cod")  # cod or wallet
 
+        form_state = {
+            "initial_phone": phone or initial_phone,
+            "initial_address": address or initial_address,
+            "selected_payment": payment_method,
+        }
+
         if not address or not phone:
-            return render(request, "checkout.html", {
-                "items": items,
-                "subtotal": subtotal,
-                "total": total,
-                "wallet_balance": wallet_balance,
-                "error": "Please fill all fields.",
-                "initial_phone": phone or initial_phone,
-                "initial_address": address or initial_address,
-                "selected_payment": payment_method,
-            })
+            return _render_checkout(request, lines, error="Please fill all fields.", **form_state)
 
         if profile:
             profile.phone = phone
             profile.default_address = address
-            profile.save()
-
-        # ✅ If user chose Wallet, validate balance and debit first
-        if payment_method == "wallet":
-            wallet = Wallet.objects.select_for_update().filter(user=request.user).first()
-            if not wallet:
-                return render(request, "checkout.html", {
-                    "items": items,
-                    "subtotal": subtotal,
-                    "total": total,
-                    "wallet_balance": Decimal("0.00"),
-                    "error": "You don't have a wallet yet. Fund your wallet first.",
-                    "initial_phone": phone or initial_phone,
-                    "initial_address": address or initial_address,
-                    "selected_payment": payment_method,
-                })
-
-            if wallet.balance < total:
-                return render(request, "checkout.html", {
-                    "items": items,
-                    "subtotal": subtotal,
-                    "total": total,
-                    "wallet_balance": wallet.balance,
-                    "error": "Insufficient wallet balance. Please fund your wallet.",
-                    "initial_phone": phone or initial_phone,
-                    "initial_address": address or initial_address,
-                    "selected_payment": payment_method,
-                })
-
-            # Debit wallet
-            wallet.balance = wallet.balance - total
-            wallet.save(update_fields=["balance", "updated_at"])
-
-        # Create order
-        order = Order.objects.create(
-            user=request.user,
-            delivery_address=address,
-            phone=phone,
-            total_amount=total,
-            status="pending",
-        )
-
-        for i in items:
-            OrderItem.objects.create(
-                order=order,
-                food=i.food,
-                quantity=i.quantity,
-                price_at_purchase=i.food.price,
-            )
-
-        # Log wallet transaction only if wallet was used
-        if payment_method == "wallet":
-            WalletTransaction.objects.create(
-                wallet=wallet,
-                tx_type="debit",
-                source="order",
-                amount=total,
-                order=order,  # only if you included this FK in WalletTransaction
-                note=f"Payment for Order #{order.id}",
-            )
+            profile.save(update_fields=["phone", "default_address"])
+
+        try:
+            with transaction.atomic():
+                # Claim the key before the cart lock, so a duplicate waits here
+                # and replays instead of finding the cart already emptied
+                remember_result(request, "checkout", reverse("orders:order_list"))
+                order = place_order(
+                    request.user, cart,
+                    address=address, phone=phone, payment_method=payment_method,
+                )
+                update_result(request, "checkout", reverse("orders:order_detail", args=[order.id]))
+        except ValueError as e:
+            return replayed_response(request, "checkout") or _render_checkout(request, lines, error=str(e), **form_state)
+        except IntegrityError:
+            # A duplicate submission committed first; ours was rolled back
+            return replayed_response(request, "checkout") or redirect("orders:order_list")
+
+        if order.payment_method == "wallet":
             messages.success(request, "Paid with wallet successfully.")
 
-        items.delete()
         return redirect("orders:order_detail", order_id=order.id)
 
-    return render(request, "checkout.html", {
-        "items": items,
-        "subtotal": subtotal,
-        "total": total,
-        "wallet_balance": wallet_balance,
-        "initial_phone": initial_phone,
-        "initial_address": initial_address,
-        "selected_payment": "cod",
-    })
+    return _render_checkout(
+        request, lines,
+        initial_phone=initial_phone,
+        initial_address=initial_address,
+    )
 
 
 @login_required
 def order_list(request):
-    orders = Order.objects.filter(user=request.user)
+    orders = CursorPaginator(Order.objects.filter(user=request.user), 20).get_page(
+        request.GET.get("after"), request.GET.get("before")
+    )
     return render(request, "order_list.html", {"orders": orders})
 
 @login_required
 def order_detail(request, order_id):
     order = get_object_or_404(Order, id=order_id, user=request.user)
-    return render(request, "order_detail.html", {"order": order})
+    return render(request, "order_detail.html", {
+        "order": order,
+        "live_stream": events.streaming(),
+        "poll_seconds": events.POLL_SECONDS,
+    })
+
+
+# =========================
+# LIVE ORDER STATUS (SSE)
+# =========================
+FINAL_STATUSES = {"delivered", "cancelled"}
+STREAM_HEARTBEAT = 15  # seconds between keep-alives / fallback status reads
+STREAM_MAX_SECONDS = 30 * 60  # then the browser's EventSource reconnects
+
+
+def _current_status(order_id):
+    return Order.objects.filter(pk=order_id).values_list("status", flat=True).afirst()
+
+
+def _last_event_id(order_id):
+    return OrderEvent.objects.filter(order_id=order_id).order_by("-id").values_list("id", flat=True).afirst()
+
+
+def _events_after(order_id, event_id):
+    return OrderEvent.objects.filter(order_id=order_id, id__gt=event_id).order_by("id").values_list("id", "to_status")
+
+
+async def _status_stream(order_id):
+    sub = events.get_broker().subscribe(events.order_channel(order_id))
+    try:
+        status = await _current_status(order_id)
+        seen = await _last_event_id(order_id) or 0
+        yield "retry: 5000\n\n"
+        yield events.sse("status", events.status_event(order_id, status))
+
+        deadline = asyncio.get_running_loop().time() + STREAM_MAX_SECONDS
+        while status not in FINAL_STATUSES and asyncio.get_running_loop().time() < deadline:
+            event = await sub.get(STREAM_HEARTBEAT)
+            if event is None:
+                # changes made by another server process never reach this
+                # process's broker; the order's event log has them
+                current = status
+                async for seen, current in _events_after(order_id, seen):
+                    pass
+                if current == status:
+                    yield ": ping\n\n"
+                    continue
+                event = events.status_event(order_id, current, status)
+
+            status = event["status"]
+            yield events.sse("status", event)
+    finally:
+        sub.close()
+
+
+@login_required
+async def order_events(request, order_id):
+    """
+    text/event-stream of status changes for one of the user's orders. Only
+    with ORDER_EVENTS_STREAMING (ASGI): under WSGI the stream would tie up a
+    worker, so it answers 204, which tells EventSource not to reconnect.
+    """
+    user = await request.auser()
+    if not await Order.objects.filter(id=order_id, user=user).aexists():
+        raise Http404
+    if not events.streaming():
+        return HttpResponse(status=204)
+
+    response = StreamingHttpResponse(_status_stream(order_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@login_required
+def order_status(request, order_id):
+    """The order's current status, for pages polling instead of streaming."""
+    status = Order.objects.filter(id=order_id, user=request.user).values_list("status", flat=True).first()
+    if status is None:
+        raise Http404
+    return JsonResponse(events.status_event(order_id, status))
 
 
 @require_POST
@@ -228,21 +269,15 @@ def update_cart_ajax(request):
 
     food = get_object_or_404(FoodItem, id=food_id)
     cart, _ = Cart.objects.get_or_create(user=request.user)
-    cart_item, created = CartItem.objects.get_or_create(cart=cart, food=food)
 
     if action in ('add', 'increment'):
-        if not created:
-            cart_item.quantity += 1
-        cart_item.save()
-
+        quantity = increment_item(cart, food)
     elif action == 'decrement':
-        cart_item.quantity -= 1
-        if cart_item.quantity <= 0:
-            cart_item.delete()
-            total = sum(CartItem.objects.filter(cart=cart).values_list('quantity', flat=True))
-            return JsonResponse({'status': 'removed', 'food_id': food_id, 'cart_count': total})
-        else:
-            cart_item.save()
-
-    total = sum(CartItem.objects.filter(cart=cart).values_list('quantity', flat=True))
-    return JsonResponse({'status': 'ok', 'food_id': food_id, 'quantity': cart_item.quantity, 'cart_count': total})
\ No newline at end of file
+        quantity = decrement_item(cart, food)
+    else:
+        return JsonResponse({'status': 'error', 'error': 'Invalid action.'}, status=400)
+
+    total = Cart.objects.filter(pk=cart.pk).values_list('item_count', flat=True).first()
+    if quantity <= 0:
+        return JsonResponse({'status': 'removed', 'food_id': food_id, 'cart_count': total})
+    return JsonResponse({'status': 'ok', 'food_id': food_id, 'quantity': quantity, 'cart_count': total})
\ No newline at end of file
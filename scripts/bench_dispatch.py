@@ -0,0 +1,108 @@
+"""
+Benchmark the rider dispatch engine (delivery.dispatch).
+
+Seeds a throwaway SQLite database (never the project database) with riders
+and `preparing` orders, then compares choosing the least-loaded rider with
+the in-memory heap against asking the database every time, and measures
+end-to-end "dispatch all pending" throughput.
+
+    python scripts/bench_dispatch.py --riders 500 --orders 5000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "foodorder.settings")
+
+
+def configure(db_path):
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = db_path
+    # dispatch here is explicit; don't fill the job queue while seeding
+    settings.DISPATCH_AUTO = False
+
+    import django
+    django.setup()
+
+
+def seed(n_riders, n_orders, batch=5_000):
+    from django.contrib.auth.models import User
+    from django.db import transaction
+
+    from accounts.models import Profile
+    from orders.models import Order
+
+    rnd = random.Random(42)
+    with transaction.atomic():
+        User.objects.bulk_create([User(username=f"rider{i}") for i in range(n_riders)], batch_size=batch)
+        rider_ids = list(User.objects.values_list("id", flat=True))
+        Profile.objects.bulk_create([Profile(user_id=r, is_delivery_guy=True) for r in rider_ids], batch_size=batch)
+        customer = User.objects.create(username="customer")
+
+        # some riders are already busy
+        Order.objects.bulk_create([
+            Order(user=customer, delivery_address="x", phone="0", total_amount=Decimal(1000),
+                  status="assigned", delivery_person_id=rnd.choice(rider_ids))
+            for _ in range(n_riders // 2)
+        ], batch_size=batch)
+        Order.objects.bulk_create([
+            Order(user=customer, delivery_address="x", phone="0", total_amount=Decimal(1000), status="preparing")
+            for _ in range(n_orders)
+        ], batch_size=batch)
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--riders", type=int, default=500)
+    parser.add_argument("--orders", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure(os.path.join(tmp, "bench.sqlite3"))
+
+        from django.core.management import call_command
+        call_command("migrate", verbosity=0)
+
+        print(f"Seeding {args.riders:,} riders and {args.orders:,} preparing orders ...")
+        seed(args.riders, args.orders)
+
+        from delivery import dispatch
+
+        index = dispatch.index()
+        heap_ms = timed(index.pick, args.repeat)
+        db_ms = timed(lambda: dispatch.riders().filter(is_available=True).order_by("active_load", "id").first(), 20)
+        load_ms = timed(dispatch.RiderIndex().load, 5)
+
+        started = time.perf_counter()
+        assigned, waiting = dispatch.dispatch_pending()
+        elapsed = time.perf_counter() - started
+
+        print()
+        print(f"{'pick least-loaded (heap)':<34}{heap_ms:>10.4f} ms")
+        print(f"{'pick least-loaded (SQL per call)':<34}{db_ms:>10.4f} ms")
+        print(f"{'index rebuild (one aggregate)':<34}{load_ms:>10.2f} ms")
+        print()
+        print(f"dispatch_pending: {assigned:,} assigned, {waiting:,} left waiting "
+              f"in {elapsed:.2f}s ({assigned / elapsed:,.0f} orders/s)")
+
+
+if __name__ == "__main__":
+    main()
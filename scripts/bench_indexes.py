@@ -0,0 +1,219 @@
+"""
+Benchmark the composite indexes on Order, WalletTopUp, WalletTransaction
+and FoodItem.
+
+Seeds a throwaway SQLite database (never the project database), then runs
+the hot filters with the Meta.indexes dropped and again with them in
+place, printing the query plan and the median time of each.
+
+    python scripts/bench_indexes.py --orders 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "foodorder.settings")
+
+
+def configure(db_path):
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = db_path
+
+    import django
+    django.setup()
+
+
+def seed(n_orders, batch=20_000):
+    from django.contrib.auth.models import User
+    from django.db import transaction
+
+    from menu.models import Category, FoodItem
+    from orders.models import Order
+    from wallet.models import Wallet, WalletTopUp, WalletTransaction
+
+    rnd = random.Random(42)
+    n_users = max(n_orders // 100, 10)
+    n_riders = max(n_users // 200, 2)
+
+    with transaction.atomic():
+        User.objects.bulk_create(
+            [User(username=f"user{i}") for i in range(n_users + n_riders)], batch_size=batch
+        )
+        user_ids = list(User.objects.values_list("id", flat=True))
+        customers, riders = user_ids[:n_users], user_ids[n_users:]
+
+        Wallet.objects.bulk_create([Wallet(user_id=u, balance=0) for u in customers], batch_size=batch)
+        wallet_ids = list(Wallet.objects.values_list("id", flat=True))
+
+        Category.objects.bulk_create([Category(name=f"Category {i}") for i in range(12)])
+        category_ids = list(Category.objects.values_list("id", flat=True))
+        FoodItem.objects.bulk_create([
+            FoodItem(
+                category_id=rnd.choice(category_ids),
+                name=f"Food {i}",
+                price=Decimal(rnd.randrange(500, 6000)),
+                available=rnd.random() > 0.1,
+                is_archived=rnd.random() < 0.2,
+            )
+            for i in range(400)
+        ])
+
+    statuses = ["pending", "preparing", "assigned", "picked_up", "on_the_way", "delivered", "delivered", "delivered", "cancelled"]
+    for start in range(0, n_orders, batch):
+        size = min(batch, n_orders - start)
+        with transaction.atomic():
+            orders = Order.objects.bulk_create([
+                Order(
+                    user_id=rnd.choice(customers),
+                    delivery_address="12 Allen Avenue, Ikeja",
+                    phone="08000000000",
+                    total_amount=Decimal(rnd.randrange(500, 20000)),
+                    status=rnd.choice(statuses),
+                    payment_method=rnd.choice(["cod", "wallet"]),
+                    is_paid=rnd.random() < 0.6,
+                    delivery_person_id=rnd.choice(riders) if rnd.random() < 0.7 else None,
+                    delivery_code="123456",
+                )
+                for _ in range(size)
+            ])
+
+            WalletTransaction.objects.bulk_create([
+                WalletTransaction(
+                    wallet_id=rnd.choice(wallet_ids),
+                    tx_type="debit",
+                    source="order",
+                    amount=o.total_amount,
+                    order=o,
+                )
+                for o in orders if o.payment_method == "wallet"
+            ])
+            WalletTopUp.objects.bulk_create([
+                WalletTopUp(
+                    user_id=rnd.choice(customers),
+                    amount=Decimal(rnd.randrange(1000, 50000)),
+                    proof="wallet_proofs/seed.jpg",
+                    status=rnd.choice(["pending", "approved", "approved", "rejected"]),
+                )
+                for _ in range(size // 10)
+            ])
+        print(f"  seeded {start + size:,} orders", flush=True)
+
+    spread_history([Order, WalletTopUp, WalletTransaction])
+    return {"customer": customers[0], "rider": riders[0], "wallet": wallet_ids[0], "category": category_ids[0]}
+
+
+def spread_history(models):
+    """auto_now_add can't be overridden on insert; scatter created_at over a year."""
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        for model in models:
+            cursor.execute(
+                f"UPDATE {model._meta.db_table} SET created_at = "
+                "strftime('%Y-%m-%d %H:%M:%f', 'now', '-' || (abs(random()) % 525600) || ' minutes')"
+            )
+
+
+def hot_queries(ids):
+    from django.db.models import Sum
+    from django.utils import timezone
+
+    from menu.models import FoodItem
+    from orders.models import Order
+    from wallet.models import WalletTopUp, WalletTransaction
+
+    last_week = timezone.now() - timedelta(days=7)
+    some_order = Order.objects.filter(payment_method="wallet").values_list("id", flat=True).first()
+
+    return {
+        "customer order list": lambda: Order.objects.filter(user_id=ids["customer"]).order_by("-created_at")[:20],
+        "control orders by status": lambda: Order.objects.filter(status="pending").order_by("-created_at")[:25],
+        "rider active orders": lambda: Order.objects.filter(delivery_person_id=ids["rider"], status="assigned"),
+        "paid revenue last 7d": lambda: Order.objects.filter(is_paid=True, created_at__gte=last_week).values("is_paid").annotate(v=Sum("total_amount")),
+        "pending top-ups": lambda: WalletTopUp.objects.filter(status="pending").order_by("-created_at")[:25],
+        "wallet statement": lambda: WalletTransaction.objects.filter(wallet_id=ids["wallet"]).order_by("-created_at")[:50],
+        "order debit exists": lambda: WalletTransaction.objects.filter(order_id=some_order, source="order", tx_type="debit")[:1],
+        "menu listing": lambda: FoodItem.objects.filter(available=True, is_archived=False, category_id=ids["category"]),
+    }
+
+
+def bench(queries, repeat):
+    results = {}
+    for name, make in queries.items():
+        plan = make().explain()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(make())
+            timings.append((time.perf_counter() - started) * 1000)
+        results[name] = (plan, statistics.median(timings))
+    return results
+
+
+def indexed_models():
+    from menu.models import FoodItem
+    from orders.models import Order
+    from wallet.models import WalletTopUp, WalletTransaction
+
+    return [Order, WalletTopUp, WalletTransaction, FoodItem]
+
+
+def set_indexes(enabled):
+    from django.db import connection
+
+    with connection.schema_editor() as editor:
+        for model in indexed_models():
+            for index in model._meta.indexes:
+                if enabled:
+                    editor.add_index(model, index)
+                else:
+                    editor.remove_index(model, index)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure(os.path.join(tmp, "bench.sqlite3"))
+
+        from django.core.management import call_command
+        call_command("migrate", verbosity=0)
+
+        print(f"Seeding {args.orders:,} orders ...")
+        ids = seed(args.orders)
+        queries = hot_queries(ids)
+
+        set_indexes(False)
+        before = bench(queries, args.repeat)
+        set_indexes(True)
+        after = bench(queries, args.repeat)
+
+        print()
+        print(f"{'query':<28}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+        for name in queries:
+            b, a = before[name][1], after[name][1]
+            print(f"{name:<28}{b:>12.2f}{a:>12.2f}{b / a if a else float('inf'):>9.1f}x")
+
+        print()
+        for name in queries:
+            print(f"== {name}")
+            print(f"  before: {before[name][0]}")
+            print(f"  after:  {after[name][0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ from django.contrib import admin, messages
 from django.db import transaction
 from django.utils import timezone
 
+from . import ledger
 from .models import Wallet, WalletTopUp, WalletTransaction
 
 
@@ -27,85 +28,30 @@ class WalletTopUpAdmin(admin.ModelAdmin):
         Credit wallet for this topup exactly once.
         Returns True if credited now, False if already credited.
         """
-        # OneToOne: if exists, it was already credited
-        if hasattr(topup, "transaction") and topup.transaction is not None:
-            return False
-
-        wallet, _ = Wallet.objects.get_or_create(user=topup.user)
-
-        wallet.balance = wallet.balance + topup.amount
-        wallet.save(update_fields=["balance", "updated_at"])
-
-        WalletTransaction.objects.create(
-            wallet=wallet,
-            tx_type="credit",
-            source="topup",
-            amount=topup.amount,
-            topup=topup,
-            note=f"Approved by {request.user}",
-        )
-        return True
+        return ledger.credit_topup_once(topup, note=f"Approved by {request.user}")
 
     @admin.action(description="Approve selected top-ups (credit wallet)")
     def approve_topups(self, request, queryset):
-        pending = queryset.filter(status="pending")
+        ids = list(queryset.values_list("pk", flat=True))
+        approved = ledger.approve_topups(ids, request.user, note=f"Approved by {request.user}")
 
-        if not pending.exists():
+        if not approved:
             self.message_user(request, "No pending top-ups selected.", level=messages.WARNING)
             return
-
-        credited_count = 0
-        skipped_already_done = 0
-
-        with transaction.atomic():
-            for topup in pending.select_for_update().select_related("user"):
-                # Extra safety
-                if topup.status != "pending":
-                    skipped_already_done += 1
-                    continue
-
-                if self._credit_wallet_once(request, topup):
-                    credited_count += 1
-                else:
-                    skipped_already_done += 1
-
-                topup.status = "approved"
-                topup.reviewed_by = request.user
-                topup.reviewed_at = timezone.now()
-                # keep any existing note; don't overwrite
-                topup.admin_note = (topup.admin_note or "").strip()
-                topup.save(update_fields=["status", "reviewed_by", "reviewed_at", "admin_note"])
-
-        msg = f"Approved {credited_count} top-up(s)."
-        if skipped_already_done:
-            msg += f" Skipped {skipped_already_done} (already reviewed/credited)."
+        msg = f"Approved {approved} top-up(s)."
+        if approved < len(ids):
+            msg += f" Skipped {len(ids) - approved} (already reviewed)."
         self.message_user(request, msg, level=messages.SUCCESS)
 
     @admin.action(description="Reject selected top-ups")
     def reject_topups(self, request, queryset):
-        pending = queryset.filter(status="pending")
-
-        if not pending.exists():
+        rejected = ledger.reject_topups(
+            list(queryset.values_list("pk", flat=True)), request.user, note="Rejected by admin.",
+        )
+        if not rejected:
             self.message_user(request, "No pending top-ups selected.", level=messages.WARNING)
             return
-
-        rejected_count = 0
-
-        with transaction.atomic():
-            for topup in pending.select_for_update().select_related("user"):
-                if topup.status != "pending":
-                    continue
-
-                topup.status = "rejected"
-                topup.reviewed_by = request.user
-                topup.reviewed_at = timezone.now()
-                if not (topup.admin_note or "").strip():
-                    topup.admin_note = "Rejected by admin."
-                topup.save(update_fields=["status", "reviewed_by", "reviewed_at", "admin_note"])
-
-                rejected_count += 1
-
-        self.message_user(request, f"Rejected {rejected_count} top-up(s).", level=messages.SUCCESS)
+        self.message_user(request, f"Rejected {rejected} top-up(s).", level=messages.SUCCESS)
 
     def save_model(self, request, obj, form, change):
         """
@@ -132,7 +78,7 @@ class WalletTopUpAdmin(admin.ModelAdmin):
 
 @admin.register(WalletTransaction)
 class WalletTransactionAdmin(admin.ModelAdmin):
-    list_display = ("id", "wallet", "tx_type", "source", "amount", "created_at", "order", "topup")
+    list_display = ("id", "wallet", "tx_type", "source", "amount", "balance_after", "created_at", "order", "topup")
     list_filter = ("tx_type", "source", "created_at")
     search_fields = ("wallet__user__username", "wallet__user__email")
     list_select_related = ("wallet", "wallet__user", "order", "topup")
@@ -0,0 +1,243 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Wallet, WalletTopUp, WalletTransaction
+
+
+# =========================
+# POSTING
+# =========================
+def post(wallet_id, tx_type, amount, *, source, order=None, topup=None, note=""):
+    """
+    Move `amount` in or out of a wallet and record it. The balance changes
+    in one conditional UPDATE (debits only match while the funds are
+    there), so there is no read-modify-write and no lock held before the
+    write; the row lock the UPDATE takes serialises the balance_after read.
+    Raises ValueError if a debit would overdraw.
+    """
+    if amount <= 0:
+        raise ValueError("Amount must be positive.")
+
+    wallets = Wallet.objects.filter(pk=wallet_id)
+    with transaction.atomic():
+        if tx_type == "credit":
+            changed = wallets.update(balance=F("balance") + amount, updated_at=timezone.now())
+        else:
+            changed = wallets.filter(balance__gte=amount).update(
+                balance=F("balance") - amount, updated_at=timezone.now(),
+            )
+        if not changed:
+            raise ValueError("Insufficient wallet balance. Please fund your wallet.")
+
+        return WalletTransaction.objects.create(
+            wallet_id=wallet_id,
+            tx_type=tx_type,
+            source=source,
+            amount=amount,
+            balance_after=wallets.values_list("balance", flat=True).get(),
+            order=order,
+            topup=topup,
+            note=note,
+        )
+
+
+def credit(user, amount, **kwargs):
+    """Credit the user's wallet, creating it on first use."""
+    wallet, _ = Wallet.objects.get_or_create(user=user)
+    return post(wallet.pk, "credit", amount, **kwargs)
+
+
+def debit(user, amount, **kwargs):
+    wallet_id = Wallet.objects.filter(user=user).values_list("pk", flat=True).first()
+    if wallet_id is None:
+        raise ValueError("You don't have a wallet yet. Fund your wallet first.")
+    return post(wallet_id, "debit", amount, **kwargs)
+
+
+# =========================
+# ONCE-ONLY POSTINGS
+# =========================
+def credit_topup_once(topup, note=""):
+    """Credit an approved top-up. Returns False if it was already credited."""
+    if WalletTransaction.objects.filter(topup=topup).exists():
+        return False
+    credit(topup.user, topup.amount, source="topup", topup=topup, note=note)
+    return True
+
+
+def debit_order_once(order, note=""):
+    """Charge an order to its customer's wallet. Returns False if it was already charged."""
+    if WalletTransaction.objects.filter(order=order, source="order", tx_type="debit").exists():
+        return False
+    debit(order.user, order.total_amount, source="order", order=order, note=note)
+    return True
+
+
+# =========================
+# BATCH TOP-UP REVIEW
+# =========================
+def approve_topups(topup_ids, reviewer, note=""):
+    """
+    Approve and credit many pending top-ups in one go: the top-ups are
+    locked once, each wallet gets one balance UPDATE for all of its
+    top-ups, the ledger rows go in with one bulk insert and the top-ups
+    are marked with one UPDATE. Returns how many were approved; anything
+    no longer pending is skipped.
+    """
+    with transaction.atomic():
+        topups = list(
+            WalletTopUp.objects.select_for_update()
+            .filter(pk__in=topup_ids, status="pending")
+            .order_by("pk")
+        )
+        if not topups:
+            return 0
+
+        # a top-up credited by an older code path is approved, not credited again
+        credited = set(
+            WalletTransaction.objects.filter(topup__in=topups).values_list("topup_id", flat=True)
+        )
+        to_credit = [t for t in topups if t.pk not in credited]
+
+        user_ids = {t.user_id for t in to_credit}
+        wallet_of = dict(Wallet.objects.filter(user_id__in=user_ids).values_list("user_id", "pk"))
+        missing = user_ids - wallet_of.keys()
+        if missing:
+            Wallet.objects.bulk_create([Wallet(user_id=u) for u in missing], ignore_conflicts=True)
+            wallet_of.update(Wallet.objects.filter(user_id__in=missing).values_list("user_id", "pk"))
+
+        totals = defaultdict(Decimal)
+        for t in to_credit:
+            totals[wallet_of[t.user_id]] += t.amount
+
+        now = timezone.now()
+        # fixed order, so two batches touching the same wallets can't deadlock
+        for wallet_id in sorted(totals):
+            Wallet.objects.filter(pk=wallet_id).update(balance=F("balance") + totals[wallet_id], updated_at=now)
+
+        # balances before this batch, then walk forward for balance_after
+        running = {
+            pk: balance - totals[pk]
+            for pk, balance in Wallet.objects.filter(pk__in=totals).values_list("pk", "balance")
+        }
+        rows = []
+        for t in to_credit:
+            wallet_id = wallet_of[t.user_id]
+            running[wallet_id] += t.amount
+            rows.append(WalletTransaction(
+                wallet_id=wallet_id, tx_type="credit", source="topup", amount=t.amount,
+                balance_after=running[wallet_id], topup=t, note=note,
+            ))
+        WalletTransaction.objects.bulk_create(rows)
+
+        WalletTopUp.objects.filter(pk__in=[t.pk for t in topups]).update(
+            status="approved", reviewed_by=reviewer, reviewed_at=now,
+        )
+    return len(topups)
+
+
+def reject_topups(topup_ids, reviewer, note=""):
+    """Reject pending top-ups in one UPDATE, keeping any existing admin note."""
+    admin_note = F("admin_note")
+    if note:
+        admin_note = Case(When(admin_note="", then=Value(note)), default=F("admin_note"))
+    return WalletTopUp.objects.filter(pk__in=topup_ids, status="pending").update(
+        status="rejected", reviewed_by=reviewer, reviewed_at=timezone.now(), admin_note=admin_note,
+    )
+
+
+# =========================
+# READING
+# =========================
+def balance_at(wallet_id, when):
+    """Balance at `when`: the newest balance_after before it, no summing."""
+    balance = (
+        WalletTransaction.objects.filter(wallet_id=wallet_id, created_at__lte=when)
+        .order_by("-created_at", "-id")
+        .values_list("balance_after", flat=True)
+        .first()
+    )
+    return balance if balance is not None else Decimal("0.00")
+
+
+# =========================
+# RECONCILIATION
+# =========================
+def _net():
+    signed = Case(When(tx_type="credit", then=F("amount")), default=-F("amount"))
+    return Sum(signed, output_field=DecimalField(max_digits=14, decimal_places=2))
+
+
+def ledger_totals(wallet_ids, transactions=None):
+    """{wallet_id: credits - debits} in one grouped query, over `transactions` if given."""
+    transactions = WalletTransaction.objects.all() if transactions is None else transactions
+    return dict(
+        transactions.filter(wallet_id__in=wallet_ids)
+        .order_by()
+        .values("wallet_id")
+        .annotate(net=_net())
+        .values_list("wallet_id", "net")
+        .iterator()
+    )
+
+
+def find_drift(start_id=None, end_id=None, chunk=1000):
+    """
+    Walk wallets with start_id <= pk < end_id in keyset chunks of `chunk`,
+    comparing each balance to its ledger. Memory stays at one chunk.
+    Yields (checked_so_far, [(wallet_id, balance, ledger_net), ...]) per chunk.
+
+    Balance and ledger sum come from the same statement, so they share a
+    snapshot: a posting committed mid-run can't show up as false drift.
+    """
+    money = DecimalField(max_digits=14, decimal_places=2)
+    net = (
+        WalletTransaction.objects.filter(wallet_id=OuterRef("pk"))
+        .order_by()
+        .values("wallet_id")
+        .annotate(net=_net())
+        .values("net")
+    )
+    wallets = Wallet.objects.order_by("pk").annotate(
+        net=Coalesce(Subquery(net, output_field=money), Value(Decimal("0.00")), output_field=money),
+    )
+    if end_id is not None:
+        wallets = wallets.filter(pk__lt=end_id)
+    last = start_id - 1 if start_id is not None else None
+    checked = 0
+    while True:
+        page = wallets.filter(pk__gt=last) if last is not None else wallets
+        rows = list(page.values_list("pk", "balance", "net")[:chunk])
+        if not rows:
+            return
+        checked += len(rows)
+        yield checked, [row for row in rows if row[1] != row[2]]
+        last = rows[-1][0]
+
+
+def correct_drift(wallet_id, note="Reconciliation adjustment"):
+    """
+    Post an `adjustment` row so the ledger sums to the wallet's balance
+    again. The balance is left alone. Returns the row, or None if the
+    wallet no longer drifts.
+    """
+    with transaction.atomic():
+        balance = Wallet.objects.select_for_update().filter(pk=wallet_id).values_list("balance", flat=True).first()
+        if balance is None:
+            return None
+        drift = balance - (ledger_totals([wallet_id]).get(wallet_id) or Decimal("0.00"))
+        if not drift:
+            return None
+        return WalletTransaction.objects.create(
+            wallet_id=wallet_id,
+            tx_type="credit" if drift > 0 else "debit",
+            source="adjustment",
+            amount=abs(drift),
+            balance_after=balance,
+            note=note,
+        )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from wallet.models import WalletTopUp
+from wallet.proofs import process
+
+
+class Command(BaseCommand):
+    help = "Re-encode top-up proofs still waiting in the incoming directory."
+
+    def handle(self, *args, **options):
+        done = failed = 0
+        for topup_id in WalletTopUp.objects.exclude(proof_pending="").values_list("id", flat=True):
+            try:
+                if process(topup_id):
+                    done += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Top-up #{topup_id}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {done} proof(s); {failed} failed."))
@@ -0,0 +1,81 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Max, Min
+
+from wallet.ledger import correct_drift, find_drift
+from wallet.models import Wallet
+
+
+def _reconcile(start_id, end_id, chunk):
+    # one shard, read only: wallets start_id <= pk < end_id
+    checked, drifted = 0, []
+    for checked, drift in find_drift(start_id, end_id, chunk):
+        drifted.extend(drift)
+    return checked, drifted
+
+
+def _reconcile_in_worker(*args):
+    try:
+        return _reconcile(*args)
+    finally:
+        connections.close_all()
+
+
+def shards(low, high, count):
+    """Split the id range [low, high] into `count` contiguous [start, end) ranges."""
+    step = max(1, -(-(high - low + 1) // count))
+    return [(start, min(start + step, high + 1)) for start in range(low, high + 1, step)]
+
+
+class Command(BaseCommand):
+    help = "Check every Wallet.balance against the sum of its ledger (credits - debits)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true",
+                            help="Post an adjustment transaction for each drifting wallet.")
+        parser.add_argument("--workers", type=int, default=1, help="Parallel processes, one wallet id range each.")
+        parser.add_argument("--chunk", type=int, default=1000, help="Wallets per query.")
+        parser.add_argument("--from-id", type=int, help="First wallet id (to split work across machines).")
+        parser.add_argument("--to-id", type=int, help="Last wallet id, inclusive.")
+
+    def handle(self, *args, **options):
+        bounds = Wallet.objects.aggregate(low=Min("pk"), high=Max("pk"))
+        low = options["from_id"] if options["from_id"] is not None else bounds["low"]
+        high = options["to_id"] if options["to_id"] is not None else bounds["high"]
+        if low is None or high is None or low > high:
+            self.stdout.write("No wallets to check.")
+            return
+
+        ranges = shards(low, high, max(1, options["workers"]))
+        jobs = [(start, end, options["chunk"]) for start, end in ranges]
+
+        if len(jobs) == 1:
+            results = [_reconcile(*jobs[0])]
+        else:
+            # forked workers must not inherit open database connections, and
+            # spawned/forkserver ones start without Django configured. The
+            # initializer is django.setup itself: anything from this module
+            # would import the models before setup runs.
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=len(jobs), initializer=django.setup) as pool:
+                futures = [pool.submit(_reconcile_in_worker, *job) for job in jobs]
+                results = [future.result() for future in as_completed(futures)]
+
+        checked = sum(r[0] for r in results)
+        drifted = sorted(d for r in results for d in r[1])
+
+        fixed = 0
+        for wallet_id, balance, net in drifted:
+            self.stdout.write(f"Wallet #{wallet_id}: balance {balance}, ledger {net}, drift {balance - net}")
+            # corrections are few; making them here keeps the shards read-only
+            if options["fix"] and correct_drift(wallet_id):
+                fixed += 1
+
+        summary = f"Checked {checked} wallet(s); {len(drifted)} drifted"
+        if options["fix"]:
+            summary += f", {fixed} corrected"
+        style = self.style.SUCCESS if not drifted or fixed == len(drifted) else self.style.WARNING
+        self.stdout.write(style(summary + "."))
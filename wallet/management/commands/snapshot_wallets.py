@@ -0,0 +1,35 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from wallet.snapshots import last_complete, period_bounds, take
+
+
+class Command(BaseCommand):
+    help = "Write WalletSnapshot rows (closing balance and activity) for finished days or months."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--period", choices=["day", "month"], default="day")
+        parser.add_argument("--date", help="Any day inside the period (YYYY-MM-DD). Default: the last finished one.")
+        parser.add_argument("--backfill", type=int, default=1, metavar="N",
+                            help="Also snapshot the N-1 periods before it, oldest first.")
+        parser.add_argument("--chunk", type=int, default=1000, help="Wallets per query.")
+
+    def handle(self, *args, **options):
+        period = options["period"]
+        try:
+            day = date.fromisoformat(options["date"]) if options["date"] else last_complete(period)
+        except ValueError:
+            raise CommandError("--date must be YYYY-MM-DD.")
+
+        days = [day]
+        for _ in range(max(1, options["backfill"]) - 1):
+            previous = period_bounds(period, days[-1])[0] - timedelta(days=1)
+            days.append(period_bounds(period, previous)[0])
+
+        for day in reversed(days):
+            period_start = period_bounds(period, day)[0]
+            written = take(period, day, chunk=options["chunk"])
+            self.stdout.write(f"{period} {period_start}: {written} snapshot(s)")
+
+        self.stdout.write(self.style.SUCCESS(f"Snapshotted {len(days)} {period}(s)."))
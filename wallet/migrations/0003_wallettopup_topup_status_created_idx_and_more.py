@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_order_order_user_created_idx_and_more'),
+        ('wallet', '0002_wallettransaction_order'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='wallettopup',
+            index=models.Index(fields=['status', '-created_at'], name='topup_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wallettransaction',
+            index=models.Index(fields=['wallet', '-created_at'], name='wallettx_wallet_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wallettransaction',
+            index=models.Index(fields=['order', 'source', 'tx_type'], name='wallettx_order_source_idx'),
+        ),
+    ]
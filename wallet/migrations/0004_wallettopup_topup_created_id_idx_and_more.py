@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_order_order_created_id_idx'),
+        ('wallet', '0003_wallettopup_topup_status_created_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='wallettopup',
+            index=models.Index(fields=['-created_at', '-id'], name='topup_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wallettransaction',
+            index=models.Index(fields=['-created_at', '-id'], name='wallettx_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0004_wallettopup_topup_created_id_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wallettopup',
+            name='proof_pending',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='wallettopup',
+            name='proof_thumbnail',
+            field=models.ImageField(blank=True, upload_to='wallet_proofs/thumbs/'),
+        ),
+        migrations.AlterField(
+            model_name='wallettopup',
+            name='proof',
+            field=models.ImageField(blank=True, upload_to='wallet_proofs/'),
+        ),
+    ]
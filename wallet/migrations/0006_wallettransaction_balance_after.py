@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:58
+
+from django.db import migrations, models
+
+
+def backfill_balance_after(apps, schema_editor):
+    # walk each wallet's history backwards from its current balance, so the
+    # newest row always agrees with Wallet.balance even if older writes drifted
+    Wallet = apps.get_model("wallet", "Wallet")
+    WalletTransaction = apps.get_model("wallet", "WalletTransaction")
+    for wallet_id, balance in Wallet.objects.values_list("pk", "balance").iterator():
+        rows = list(WalletTransaction.objects.filter(wallet_id=wallet_id).order_by("-created_at", "-id"))
+        for tx in rows:
+            tx.balance_after = balance
+            balance -= tx.amount if tx.tx_type == "credit" else -tx.amount
+        WalletTransaction.objects.bulk_update(rows, ["balance_after"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0005_topup_proof_processing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wallettransaction',
+            name='balance_after',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(backfill_balance_after, migrations.RunPython.noop),
+    ]
@@ -28,7 +28,10 @@ class WalletTopUp(models.Model):
         related_name="wallet_topups",
     )
     amount = models.DecimalField(max_digits=12, decimal_places=2)
-    proof = models.ImageField(upload_to="wallet_proofs/")
+    # Empty until wallet.proofs has re-encoded the upload stashed at proof_pending
+    proof = models.ImageField(upload_to="wallet_proofs/", blank=True)
+    proof_thumbnail = models.ImageField(upload_to="wallet_proofs/thumbs/", blank=True)
+    proof_pending = models.CharField(max_length=255, blank=True, editable=False)
     reference = models.CharField(max_length=100, blank=True)
 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
@@ -43,11 +46,18 @@ class WalletTopUp(models.Model):
     reviewed_at = models.DateTimeField(null=True, blank=True)
     admin_note = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "-created_at"], name="topup_status_created_idx"),
+            models.Index(fields=["-created_at", "-id"], name="topup_created_id_idx"),
+        ]
+
     def __str__(self):
         return f"TopUp #{self.id} - {self.user} - ₦{self.amount} ({self.status})"
 
 
 class WalletTransaction(models.Model):
+    """Append-only: rows are only ever posted through wallet.ledger."""
     TYPE_CHOICES = [("credit", "Credit"), ("debit", "Debit")]
     SOURCE_CHOICES = [("topup", "Top up"), ("order", "Order payment"), ("adjustment", "Adjustment")]
 
@@ -55,6 +65,8 @@ class WalletTransaction(models.Model):
     tx_type = models.CharField(max_length=10, choices=TYPE_CHOICES)
     source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
     amount = models.DecimalField(max_digits=12, decimal_places=2)
+    # wallet balance right after this posting (see wallet.ledger)
+    balance_after = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     order = models.ForeignKey("orders.Order", null=True, blank=True, on_delete=models.SET_NULL)
 
@@ -68,5 +80,42 @@ class WalletTransaction(models.Model):
 
     note = models.CharField(max_length=255, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["wallet", "-created_at"], name="wallettx_wallet_created_idx"),
+            models.Index(fields=["order", "source", "tx_type"], name="wallettx_order_source_idx"),
+            models.Index(fields=["-created_at", "-id"], name="wallettx_created_id_idx"),
+        ]
+
     def __str__(self):
         return f"{self.wallet.user} {self.tx_type} ₦{self.amount} ({self.source})"
+
+
+class WalletSnapshot(models.Model):
+    """
+    A wallet's closing balance and activity for one day or month, written
+    by `manage.py snapshot_wallets` (see wallet.snapshots). Statements
+    start from the nearest one instead of replaying the whole ledger.
+    """
+    PERIOD_CHOICES = [("day", "Day"), ("month", "Month")]
+
+    wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name="snapshots")
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    # covers ledger rows created before this instant
+    closing_at = models.DateTimeField()
+    balance = models.DecimalField(max_digits=12, decimal_places=2)
+    credits = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    debits = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    tx_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["wallet", "period", "period_start"], name="uniq_wallet_snapshot_period"),
+        ]
+        indexes = [
+            models.Index(fields=["wallet", "-closing_at"], name="walletsnap_wallet_closing_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.wallet_id} {self.period} {self.period_start}: ₦{self.balance}"
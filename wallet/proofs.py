@@ -0,0 +1,92 @@
+import os
+import uuid
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from orders.jobs import enqueue
+from .models import WalletTopUp
+
+MAX_UPLOAD_BYTES = getattr(settings, "WALLET_PROOF_MAX_BYTES", 15 * 1024 * 1024)
+MAX_SIDE = getattr(settings, "WALLET_PROOF_MAX_SIDE", 1600)
+THUMB_SIDE = 320
+QUALITY = 75
+
+# Raw uploads wait here, outside MEDIA_ROOT, until they are re-encoded. The
+# raw file is the only copy until the job runs, so this must survive restarts
+# and be shared with the runworker process: not /tmp.
+INCOMING_DIR = getattr(
+    settings, "WALLET_PROOF_INCOMING_DIR",
+    os.path.join(settings.BASE_DIR, "private", "wallet_proofs"),
+)
+
+
+# =========================
+# REQUEST SIDE
+# =========================
+def validate_upload(upload):
+    """Cheap checks only: size and a header sniff. Raises ValueError."""
+    if upload.size > MAX_UPLOAD_BYTES:
+        raise ValueError(f"Proof is too large (max {MAX_UPLOAD_BYTES // (1024 * 1024)} MB).")
+    try:
+        with Image.open(upload) as img:
+            img.verify()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise ValueError("Proof must be an image (JPG, PNG, WebP...).")
+    finally:
+        upload.seek(0)
+
+
+def stash_upload(upload):
+    """Copy the upload to the incoming dir chunk by chunk; returns the path."""
+    os.makedirs(INCOMING_DIR, mode=0o700, exist_ok=True)
+    path = os.path.join(INCOMING_DIR, uuid.uuid4().hex)
+    with open(path, "wb") as out:
+        for chunk in upload.chunks():
+            out.write(chunk)
+    return path
+
+
+def schedule(topup):
+    """Queue the re-encode for `manage.py runworker`."""
+    enqueue(process, priority=5, topup_id=topup.pk)
+
+
+# =========================
+# WORKER SIDE
+# =========================
+def _encode(img, side, fmt, **options):
+    copy = img.copy()
+    copy.thumbnail((side, side), Image.Resampling.LANCZOS)
+    out = BytesIO()
+    # no exif= passed, so location/device metadata is dropped
+    copy.save(out, fmt, quality=QUALITY, **options)
+    return out.getvalue()
+
+
+def process(topup_id):
+    """
+    Downscale the stashed upload to MAX_SIDE, re-encode it as JPEG without
+    metadata, add a THUMB_SIDE WebP thumbnail and delete the raw file.
+    """
+    topup = WalletTopUp.objects.filter(pk=topup_id).exclude(proof_pending="").first()
+    if topup is None:
+        return False
+    path = topup.proof_pending
+
+    with Image.open(path) as raw:
+        img = ImageOps.exif_transpose(raw).convert("RGB")
+
+    name = f"{uuid.uuid4().hex}.jpg"
+    topup.proof.save(name, ContentFile(_encode(img, MAX_SIDE, "JPEG", optimize=True)), save=False)
+    topup.proof_thumbnail.save(name.replace(".jpg", ".webp"), ContentFile(_encode(img, THUMB_SIDE, "WEBP")), save=False)
+    topup.proof_pending = ""
+    topup.save(update_fields=["proof", "proof_thumbnail", "proof_pending"])
+
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    return True
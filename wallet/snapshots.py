@@ -0,0 +1,113 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .ledger import ledger_totals
+from .models import Wallet, WalletSnapshot, WalletTransaction
+
+ZERO = Decimal("0.00")
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+
+def _midnight(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def period_bounds(period, day):
+    """(period_start, start, end) for the day or month containing `day`; end is exclusive."""
+    if period == "month":
+        first = day.replace(day=1)
+        following = (first + timedelta(days=32)).replace(day=1)
+        return first, _midnight(first), _midnight(following)
+    return day, _midnight(day), _midnight(day + timedelta(days=1))
+
+
+# =========================
+# WRITING
+# =========================
+def take(period, day, chunk=1000):
+    """
+    Snapshot every wallet that has a ledger by the end of the period
+    containing `day`, `chunk` wallets per pass: one grouped query for the
+    period's activity, one for closing balances (the last balance_after),
+    one upsert. Re-running a period overwrites it. Returns rows written.
+    """
+    period_start, start, end = period_bounds(period, day)
+    closing = (
+        WalletTransaction.objects.filter(wallet=OuterRef("pk"), created_at__lt=end)
+        .order_by("-created_at", "-id")
+        .values("balance_after")[:1]
+    )
+    written, last = 0, 0
+    while True:
+        rows = list(
+            Wallet.objects.filter(pk__gt=last)
+            .order_by("pk")
+            .annotate(closing=Subquery(closing))
+            .values_list("pk", "closing")[:chunk]
+        )
+        if not rows:
+            return written
+        last = rows[-1][0]
+
+        ids = [pk for pk, balance in rows if balance is not None]
+        activity = {
+            r["wallet_id"]: r
+            for r in WalletTransaction.objects.filter(wallet_id__in=ids, created_at__gte=start, created_at__lt=end)
+            .order_by()
+            .values("wallet_id")
+            .annotate(
+                credits=Coalesce(Sum("amount", filter=Q(tx_type="credit")), ZERO, output_field=MONEY),
+                debits=Coalesce(Sum("amount", filter=Q(tx_type="debit")), ZERO, output_field=MONEY),
+                tx_count=Count("id"),
+            )
+        }
+        snapshots = []
+        for pk, balance in rows:
+            if balance is None:
+                continue  # no ledger yet
+            a = activity.get(pk, {})
+            snapshots.append(WalletSnapshot(
+                wallet_id=pk, period=period, period_start=period_start, closing_at=end, balance=balance,
+                credits=a.get("credits", ZERO), debits=a.get("debits", ZERO), tx_count=a.get("tx_count", 0),
+            ))
+        WalletSnapshot.objects.bulk_create(
+            snapshots,
+            update_conflicts=True,
+            unique_fields=["wallet", "period", "period_start"],
+            update_fields=["closing_at", "balance", "credits", "debits", "tx_count"],
+        )
+        written += len(snapshots)
+
+
+def last_complete(period, today=None):
+    """The most recent day (or first of month) whose period has fully ended."""
+    today = today or timezone.localdate()
+    if period == "month":
+        return (today.replace(day=1) - timedelta(days=1)).replace(day=1)
+    return today - timedelta(days=1)
+
+
+# =========================
+# READING
+# =========================
+def opening_balance(wallet_id, at):
+    """
+    Balance just before `at`: the nearest snapshot closing at or before
+    it, plus only the ledger rows between that snapshot and `at`.
+    """
+    snapshot = (
+        WalletSnapshot.objects.filter(wallet_id=wallet_id, closing_at__lte=at)
+        .order_by("-closing_at")
+        .values_list("closing_at", "balance")
+        .first()
+    )
+    since, balance = snapshot or (None, ZERO)
+    remaining = WalletTransaction.objects.filter(created_at__lt=at)
+    if since is not None:
+        remaining = remaining.filter(created_at__gte=since)
+    return balance + (ledger_totals([wallet_id], remaining).get(wallet_id) or ZERO)
+
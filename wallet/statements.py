@@ -0,0 +1,54 @@
+import csv
+import json
+
+from orders.exports import Echo, csv_cell, json_default
+
+from .models import WalletTransaction
+from .snapshots import opening_balance
+
+FIELDS = ["id", "created_at", "tx_type", "source", "amount", "balance", "order_id", "topup_id", "note"]
+
+
+def rows(wallet_id, start, end, chunk=2000):
+    """
+    Yield ("opening", balance), one ("tx", row) per ledger row in
+    [start, end) with its running balance, then ("closing", balance).
+    Rows are read as dicts in chunks, so memory doesn't grow with the range.
+    """
+    balance = opening_balance(wallet_id, start)
+    yield "opening", balance
+
+    transactions = (
+        WalletTransaction.objects.filter(wallet_id=wallet_id, created_at__gte=start, created_at__lt=end)
+        .order_by("created_at", "id")
+        .values("id", "created_at", "tx_type", "source", "amount", "order_id", "topup_id", "note")
+    )
+    for tx in transactions.iterator(chunk_size=chunk):
+        balance += tx["amount"] if tx["tx_type"] == "credit" else -tx["amount"]
+        tx["balance"] = balance
+        yield "tx", tx
+    yield "closing", balance
+
+
+def as_csv(statement):
+    writer = csv.writer(Echo())
+    yield writer.writerow(FIELDS)
+    for kind, value in statement:
+        if kind == "tx":
+            yield writer.writerow([csv_cell(value[f]) for f in FIELDS])
+        else:
+            yield writer.writerow(["", "", kind, "", "", value, "", "", ""])
+
+
+def as_json(statement, **header):
+    """One JSON document, written a transaction at a time."""
+    yield json.dumps(header)[:-1]
+    first = True
+    for kind, value in statement:
+        if kind == "opening":
+            yield f'{", " if header else ""}"opening_balance": "{value}", "transactions": ['
+        elif kind == "tx":
+            yield ("" if first else ",") + json.dumps(value, default=json_default)
+            first = False
+        else:
+            yield f'], "closing_balance": "{value}"}}'
@@ -1,3 +1,264 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import ledger, proofs, snapshots
+from .models import Wallet, WalletSnapshot, WalletTopUp, WalletTransaction
+from .snapshots import period_bounds
+
+
+class LedgerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("ada", password="pass12345")
+
+    def test_postings_carry_running_balance(self):
+        ledger.credit(self.user, Decimal("1000.00"), source="adjustment")
+        ledger.debit(self.user, Decimal("300.00"), source="adjustment")
+        ledger.credit(self.user, Decimal("50.00"), source="adjustment")
+
+        wallet = Wallet.objects.get(user=self.user)
+        self.assertEqual(wallet.balance, Decimal("750.00"))
+        self.assertEqual(
+            list(wallet.transactions.order_by("id").values_list("balance_after", flat=True)),
+            [Decimal("1000.00"), Decimal("700.00"), Decimal("750.00")],
+        )
+
+    def test_debit_never_overdraws(self):
+        ledger.credit(self.user, Decimal("100.00"), source="adjustment")
+        with self.assertRaises(ValueError):
+            ledger.debit(self.user, Decimal("100.01"), source="adjustment")
+
+        self.assertEqual(Wallet.objects.get(user=self.user).balance, Decimal("100.00"))
+        self.assertEqual(WalletTransaction.objects.count(), 1)
+
+    def test_topup_is_credited_once(self):
+        topup = WalletTopUp.objects.create(user=self.user, amount=Decimal("500.00"))
+        self.assertTrue(ledger.credit_topup_once(topup))
+        self.assertFalse(ledger.credit_topup_once(topup))
+        self.assertEqual(Wallet.objects.get(user=self.user).balance, Decimal("500.00"))
+
+
+class ConcurrentLedgerTests(TransactionTestCase):
+    POSTINGS = 100
+
+    def setUp(self):
+        self.user = User.objects.create_user("ada", password="pass12345")
+        ledger.credit(self.user, Decimal("1000.00"), source="adjustment")
+
+    def _post(self, i):
+        try:
+            if i % 2:
+                ledger.debit(self.user, Decimal("7.00"), source="adjustment")
+            else:
+                ledger.credit(self.user, Decimal("10.00"), source="adjustment")
+        finally:
+            connection.close()
+
+    def test_parallel_postings_are_not_lost(self):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(self._post, range(self.POSTINGS)))
+
+        wallet = Wallet.objects.get(user=self.user)
+        half = self.POSTINGS // 2
+        self.assertEqual(wallet.balance, Decimal("1000.00") + half * Decimal("3.00"))
+        # the newest posting agrees with the wallet
+        latest = wallet.transactions.order_by("-id").first()
+        self.assertEqual(latest.balance_after, wallet.balance)
+
+
+class ReconcileWalletsTests(TestCase):
+    def test_reports_and_corrects_drift(self):
+        users = [User.objects.create_user(f"u{i}", password="pass12345") for i in range(5)]
+        for user in users:
+            ledger.credit(user, Decimal("100.00"), source="adjustment")
+        # a balance edited behind the ledger's back
+        Wallet.objects.filter(user=users[2]).update(balance=Decimal("80.00"))
+
+        out = StringIO()
+        call_command("reconcile_wallets", "--chunk", "2", stdout=out)
+        self.assertIn("drift -20.00", out.getvalue())
+        self.assertIn("Checked 5 wallet(s); 1 drifted", out.getvalue())
+
+        call_command("reconcile_wallets", "--fix", stdout=StringIO())
+        out = StringIO()
+        call_command("reconcile_wallets", stdout=out)
+        self.assertIn("0 drifted", out.getvalue())
+        adjustment = WalletTransaction.objects.get(tx_type="debit")
+        self.assertEqual((adjustment.amount, adjustment.balance_after), (Decimal("20.00"), Decimal("80.00")))
+
+    def test_balance_and_ledger_come_from_one_query(self):
+        users = [User.objects.create_user(f"u{i}", password="pass12345") for i in range(3)]
+        ledger.credit(users[0], Decimal("50.00"), source="adjustment")
+        Wallet.objects.create(user=users[1], balance=Decimal("5.00"))  # no ledger rows at all
+        Wallet.objects.create(user=users[2])
+        with self.assertNumQueries(3):  # two chunks, then the empty page
+            found = list(ledger.find_drift(chunk=2))
+        self.assertEqual([d[1:] for _, drift in found for d in drift], [(Decimal("5.00"), Decimal("0.00"))])
+
+
+def png_upload(name="proof.png", size=(40, 30)):
+    out = BytesIO()
+    Image.new("RGB", size, "white").save(out, "PNG")
+    return SimpleUploadedFile(name, out.getvalue(), content_type="image/png")
+
+
+class TopupReplayTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("ada", password="pass12345")
+        self.client.force_login(self.user)
+
+    def tearDown(self):
+        for path in WalletTopUp.objects.exclude(proof_pending="").values_list("proof_pending", flat=True):
+            os.remove(path)
+
+    def test_resubmitted_form_stores_one_topup(self):
+        for _ in range(2):
+            response = self.client.post(reverse("wallet:topup_create"), {
+                "amount": "2500", "reference": "TRF-1", "proof": png_upload(), "idempotency_key": "c" * 32,
+            })
+            self.assertRedirects(response, reverse("wallet:topup_create"), fetch_redirect_response=False)
+
+        self.assertEqual(WalletTopUp.objects.filter(user=self.user).count(), 1)
+
+
+class ProofTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        media = override_settings(MEDIA_ROOT=os.path.join(tmp.name, "media"))
+        media.enable()
+        self.addCleanup(media.disable)
+        self.user = User.objects.create_user("ada", password="pass12345")
+
+    def test_validate_upload_rejects_non_images(self):
+        fake = SimpleUploadedFile("proof.png", b"%PDF-1.7 not a picture", content_type="image/png")
+        with self.assertRaisesMessage(ValueError, "Proof must be an image"):
+            proofs.validate_upload(fake)
+
+        upload = png_upload()
+        proofs.validate_upload(upload)
+        self.assertEqual(upload.tell(), 0)  # rewound for stash_upload
+
+    def test_process_strips_exif_and_writes_thumbnail(self):
+        exif = Image.Exif()
+        exif[0x010F] = "PhoneMaker"  # Make
+        raw = os.path.join(self.tmp, "raw")
+        Image.new("RGB", (2000, 1000), "green").save(raw, "JPEG", exif=exif)
+        topup = WalletTopUp.objects.create(user=self.user, amount=Decimal("10.00"), proof_pending=raw)
+
+        self.assertTrue(proofs.process(topup.pk))
+
+        topup.refresh_from_db()
+        self.assertEqual(topup.proof_pending, "")
+        self.assertFalse(os.path.exists(raw))
+        with topup.proof.open("rb") as f, Image.open(f) as img:
+            self.assertEqual((img.format, img.size), ("JPEG", (proofs.MAX_SIDE, proofs.MAX_SIDE // 2)))
+            self.assertEqual(dict(img.getexif()), {})
+        with topup.proof_thumbnail.open("rb") as f, Image.open(f) as img:
+            self.assertEqual((img.format, img.size), ("WEBP", (proofs.THUMB_SIDE, proofs.THUMB_SIDE // 2)))
+
+        self.assertFalse(proofs.process(topup.pk))  # nothing pending any more
+
+
+class BulkTopupReviewTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user("staff", password="pass12345", is_staff=True)
+        self.users = [User.objects.create_user(f"u{i}", password="pass12345") for i in range(3)]
+        ledger.credit(self.users[0], Decimal("100.00"), source="adjustment")
+
+    def _topups(self, n):
+        return [
+            WalletTopUp.objects.create(user=self.users[i % len(self.users)], amount=Decimal("10.00") * (i + 1))
+            for i in range(n)
+        ]
+
+    def test_batch_credits_each_wallet_once_with_running_balances(self):
+        topups = self._topups(6)
+        with CaptureQueriesContext(connection) as ctx:
+            approved = ledger.approve_topups([t.pk for t in topups], self.staff)
+        self.assertEqual(approved, 6)
+        # lock, credited check, wallets, create missing + reread, one UPDATE per wallet,
+        # balances, bulk insert, top-up UPDATE (+ savepoints)
+        self.assertLessEqual(len(ctx), 14)
+
+        wallet = Wallet.objects.get(user=self.users[0])
+        self.assertEqual(wallet.balance, Decimal("150.00"))  # 100 + 10 + 40
+        self.assertEqual(
+            list(wallet.transactions.order_by("id").values_list("balance_after", flat=True)),
+            [Decimal("100.00"), Decimal("110.00"), Decimal("150.00")],
+        )
+        self.assertFalse(WalletTopUp.objects.exclude(status="approved").exists())
+        self.assertEqual(ledger.approve_topups([t.pk for t in topups], self.staff), 0)
+
+    def test_bulk_view_rejects_selected(self):
+        topups = self._topups(3)
+        self.client.force_login(self.staff)
+        response = self.client.post(reverse("control:topups_bulk"), {
+            "ids": [topups[0].pk, topups[1].pk], "action": "reject",
+        })
+        self.assertRedirects(response, reverse("control:topups_list"), fetch_redirect_response=False)
+        self.assertEqual(
+            list(WalletTopUp.objects.order_by("pk").values_list("status", flat=True)),
+            ["rejected", "rejected", "pending"],
+        )
+
+
+class SnapshotStatementTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("ada", password="pass12345")
+        today = timezone.localdate()
+        self.days = [today - timedelta(days=n) for n in (3, 2, 0)]
+        for day, (kind, amount) in zip(self.days, [("credit", "100.00"), ("debit", "30.00"), ("credit", "50.00")]):
+            tx = getattr(ledger, kind)(self.user, Decimal(amount), source="adjustment")
+            WalletTransaction.objects.filter(pk=tx.pk).update(created_at=period_bounds("day", day)[1] + timedelta(hours=12))
+        self.wallet = Wallet.objects.get(user=self.user)
+
+    def test_opening_balance_matches_ledger_with_and_without_snapshots(self):
+        checkpoints = [period_bounds("day", d)[1] for d in self.days] + [timezone.now()]
+        expected = [ledger.balance_at(self.wallet.pk, at - timedelta(microseconds=1)) for at in checkpoints]
+
+        self.assertEqual([snapshots.opening_balance(self.wallet.pk, at) for at in checkpoints], expected)
+        call_command("snapshot_wallets", "--date", str(self.days[1]), "--backfill", "2", stdout=StringIO())
+        self.assertEqual(WalletSnapshot.objects.count(), 2)
+        self.assertEqual([snapshots.opening_balance(self.wallet.pk, at) for at in checkpoints], expected)
+
+        snap = WalletSnapshot.objects.get(period_start=self.days[1])
+        self.assertEqual((snap.balance, snap.debits, snap.tx_count), (Decimal("70.00"), Decimal("30.00"), 1))
+
+    def test_statement_streams_running_balances(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("wallet:statement"), {
+            "from": str(self.days[1]), "to": str(self.days[2]), "format": "json",
+        })
+        self.assertTrue(response.streaming)
+        data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(data["opening_balance"], "100.00")
+        self.assertEqual([t["balance"] for t in data["transactions"]], ["70.00", "120.00"])
+        self.assertEqual(data["closing_balance"], "120.00")
+
+        response = self.client.get(reverse("wallet:statement"), {"from": str(self.days[0]), "to": str(self.days[0])})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 4)  # header, opening, one row, closing
+
+        # both formats write ISO 8601 timestamps
+        tx = WalletTransaction.objects.filter(wallet=self.wallet, created_at__gte=period_bounds("day", self.days[1])[1])
+        created_at = tx.order_by("created_at").first().created_at.isoformat()
+        self.assertEqual(data["transactions"][0]["created_at"], created_at)
+        self.assertIn(created_at, b"".join(self.client.get(reverse("wallet:statement"), {
+            "from": str(self.days[1]), "to": str(self.days[2]),
+        }).streaming_content).decode())
@@ -6,4 +6,5 @@ app_name = "wallet"
 urlpatterns = [
     path("", views.dashboard, name="dashboard"),
     path("topup/", views.topup_create, name="topup_create"),
+    path("statement/", views.statement, name="statement"),
 ]
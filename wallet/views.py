@@ -1,13 +1,26 @@
+from datetime import date, timedelta
 from decimal import Decimal, InvalidOperation
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect, render
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.urls import reverse
+from django.utils import timezone
+from orders import exports
+from orders.idempotency import issue_key, remember_result, replayed_response
+from . import proofs, statements
+from .snapshots import period_bounds
 from .models import Wallet, WalletTopUp, WalletTransaction
 
 
 @login_required
 def topup_create(request):
+    if request.method == "POST":
+        # Same form posted twice: don't store a second proof
+        replay = replayed_response(request, "topup")
+        if replay:
+            return replay
+
     # Ensure wallet exists (so balance can show on page)
     wallet, _ = Wallet.objects.get_or_create(user=request.user)
 
@@ -28,6 +41,7 @@ def topup_create(request):
                 "error": "Enter a valid amount.",
                 "amount": amount_raw,
                 "reference": reference,
+                "idempotency_key": issue_key(request),
             })
 
         if not proof:
@@ -36,21 +50,44 @@ def topup_create(request):
                 "error": "Please upload a payment screenshot (proof).",
                 "amount": amount_raw,
                 "reference": reference,
+                "idempotency_key": issue_key(request),
+            })
+
+        try:
+            proofs.validate_upload(proof)
+        except ValueError as e:
+            return render(request, "wallet/topup_create.html", {
+                "wallet": wallet,
+                "error": str(e),
+                "amount": amount_raw,
+                "reference": reference,
+                "idempotency_key": issue_key(request),
             })
 
         # Create top-up request as pending
-        WalletTopUp.objects.create(
-            user=request.user,
-            amount=amount,
-            proof=proof,
-            reference=reference,
-            status="pending",
-        )
+        try:
+            with transaction.atomic():
+                # Claim the key before the proof is written to storage
+                remember_result(request, "topup", reverse("wallet:topup_create"))
+                topup = WalletTopUp.objects.create(
+                    user=request.user,
+                    amount=amount,
+                    proof_pending=proofs.stash_upload(proof),
+                    reference=reference,
+                    status="pending",
+                )
+                # downscaled and stored by the job worker
+                proofs.schedule(topup)
+        except IntegrityError:
+            return replayed_response(request, "topup") or redirect("wallet:topup_create")
 
         messages.success(request, "Top-up submitted. Waiting for admin approval.")
         return redirect("wallet:topup_create")
 
-    return render(request, "wallet/topup_create.html", {"wallet": wallet})
+    return render(request, "wallet/topup_create.html", {
+        "wallet": wallet,
+        "idempotency_key": issue_key(request),
+    })
 
 @login_required
 def dashboard(request):
@@ -64,3 +101,34 @@ def dashboard(request):
         "transactions": transactions,
         "topups": topups,
     })
+
+
+def _day(value, default):
+    try:
+        return date.fromisoformat(value) if value else default
+    except ValueError:
+        return default
+
+
+@login_required
+def statement(request):
+    """
+    The user's ledger for ?from=YYYY-MM-DD to ?to=YYYY-MM-DD (inclusive,
+    default: this month so far) with running balances, streamed as CSV
+    or, with ?format=json, as one JSON document.
+    """
+    wallet, _ = Wallet.objects.get_or_create(user=request.user)
+    today = timezone.localdate()
+    first = _day(request.GET.get("from"), today.replace(day=1))
+    last = _day(request.GET.get("to"), today)
+    if last < first:
+        first, last = last, first
+    start = period_bounds("day", first)[1]
+    end = period_bounds("day", last + timedelta(days=1))[1]
+
+    rows = statements.rows(wallet.pk, start, end)
+    filename = f"wallet-statement-{first}-{last}"
+    if request.GET.get("format") == "json":
+        body = statements.as_json(rows, wallet=wallet.pk, **{"from": str(first), "to": str(last)})
+        return exports.download(request, body, "application/json", filename + ".json")
+    return exports.download(request, statements.as_csv(rows), "text/csv", filename + ".csv")